@@ -0,0 +1,150 @@
+"""
+admission.py — Admission control for yt-dlp extractions.
+
+Nothing used to limit concurrent extractions: a burst of /watch and
+/api/channel-avatar requests started dozens of CPU- and network-heavy
+yt-dlp runs at once and every request slowed down together. Now each
+extraction must hold one of MAX_EXTRACTIONS slots:
+
+    with admission.slot('video'):
+        info = ydl.extract_info(url, download=False)
+
+Waiting callers are admitted by priority class, then arrival order:
+
+  video (watch) > search > browse (channel, playlist) > avatar > background
+
+Each class has a queue timeout and a queue-length cap. A caller that
+can't get a slot in time — or arrives to a full queue — is shed with
+Overloaded, which the call sites turn into a fall-through to the cheaper
+Invidious tier (or a 503). Extra load turns into fast fallbacks instead
+of slower everything, so yt-dlp throughput stays flat under overload.
+
+Background work (prefetch, warm-up) runs inside `with admission.background():`
+and always queues behind user requests.
+"""
+
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+
+import deadline
+import metrics
+import tracing
+
+MAX_EXTRACTIONS = int(os.environ.get('VIEWTUBE_MAX_EXTRACTIONS', 4))
+
+# class → (priority — lower runs first, queue timeout seconds, max queued)
+CLASSES = {
+    'video':      (0, 4.0, 32),
+    'search':     (1, 3.0, 24),
+    'browse':     (2, 3.0, 16),
+    'avatar':     (3, 1.0, 8),
+    'background': (4, 10.0, 4),
+}
+# extraction op (tracing / metrics name) → class
+OP_CLASS = {
+    'video': 'video', 'search': 'search', 'channel': 'browse',
+    'playlist': 'browse', 'avatar': 'avatar',
+}
+
+_background = contextvars.ContextVar('viewtube_background', default=False)
+
+
+class Overloaded(RuntimeError):
+    """No extraction slot within the class's queue timeout — caller should fall back."""
+
+
+class _PriorityGate:
+    """Counting semaphore that hands freed slots to the best-priority waiter."""
+
+    def __init__(self, slots):
+        self.slots   = slots
+        self.busy    = 0
+        self.waiting = 0
+        self._heap   = []                  # [priority, seq, state, event]
+        self._queued = {}                  # {class: waiting count}
+        self._seq    = itertools.count()
+        self._lock   = threading.Lock()
+
+    def acquire(self, cls, priority, timeout, max_queued):
+        with self._lock:
+            if self.busy < self.slots and not self.waiting:
+                self.busy += 1
+                return True
+            if self._queued.get(cls, 0) >= max_queued:
+                return False
+            entry = [priority, next(self._seq), 'waiting', threading.Event()]
+            heapq.heappush(self._heap, entry)
+            self.waiting += 1
+            self._queued[cls] = self._queued.get(cls, 0) + 1
+
+        entry[3].wait(timeout)
+
+        with self._lock:
+            self._queued[cls] -= 1
+            if entry[2] == 'granted':      # may have been granted just as the wait timed out
+                return True
+            entry[2] = 'cancelled'         # lazily dropped by release()
+            self.waiting -= 1
+            return False
+
+    def release(self):
+        with self._lock:
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                if entry[2] == 'waiting':
+                    entry[2] = 'granted'   # the slot passes straight to the waiter
+                    self.waiting -= 1
+                    entry[3].set()
+                    return
+            self.busy -= 1
+
+    def stats(self):
+        with self._lock:
+            return {'slots': self.slots, 'busy': self.busy, 'waiting': self.waiting,
+                    'queued': dict(self._queued)}
+
+
+_gate = _PriorityGate(MAX_EXTRACTIONS)
+
+
+@contextlib.contextmanager
+def background():
+    """Mark extractions in this block as background work (lowest priority)."""
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+
+@contextlib.contextmanager
+def slot(op):
+    """Hold one extraction slot for the block, or raise Overloaded."""
+    cls = 'background' if _background.get() else OP_CLASS.get(op, 'search')
+    priority, queue_timeout, max_queued = CLASSES[cls]
+    # Never queue past the request deadline — nobody would be left to answer
+    left = deadline.current().remaining()
+    timeout = queue_timeout if left is None else min(queue_timeout, left)
+
+    start = time.perf_counter()
+    admitted = _gate.acquire(cls, priority, timeout, max_queued)
+    waited = time.perf_counter() - start
+    metrics.admission_wait.observe(waited, cls, 'admitted' if admitted else 'shed')
+    if waited > 0.001:
+        tracing.add('queue', waited * 1000, cls)
+    if not admitted:
+        raise Overloaded(f"yt-dlp {op} shed after {waited:.2f}s ({cls} queue)")
+    try:
+        yield
+    finally:
+        _gate.release()
+
+
+def stats():
+    """Slots in use and queue depth per class — for debugging."""
+    return _gate.stats()
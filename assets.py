@@ -0,0 +1,132 @@
+"""
+assets.py — Content-hashed, precompressed static files.
+
+style.css and the JS files used to be served raw on every cold visit,
+with no cache lifetime. They are now built into static/dist/:
+
+  static/dist/style.<hash>.css       sha256 of the contents, 10 hex chars
+  static/dist/style.<hash>.css.gz    gzip -9
+  static/dist/style.<hash>.css.br    brotli 11 (if brotli is installed)
+  static/dist/manifest.json          {source name: {path, encodings}}
+
+url_for('static', filename='style.css') in the templates resolves to
+the hashed name (index.py), and those URLs are served with the best
+precompressed variant the client accepts and Cache-Control: immutable.
+A changed file gets a new name, so nothing has to be purged.
+
+  python assets.py          # build at deploy time
+
+On start-up the app checks the manifest against the sources and
+rebuilds if they changed. When static/ is read-only (Vercel) and nothing
+was built, the plain files are served as before.
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+
+import compress
+import logs
+
+log = logs.get('assets')
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST       = 'dist'
+TYPES      = ('.css', '.js')
+MAX_AGE    = 365 * 24 * 3600
+SUFFIX     = {'br': '.br', 'gzip': '.gz'}
+
+_manifest = {}   # {'style.css': {'path': 'dist/style.<hash>.css', 'encodings': [...]}}
+_by_path  = {}   # {'dist/style.<hash>.css': manifest entry}
+
+
+def _sources(static_dir):
+    """{name: bytes} for the top-level css/js files."""
+    out = {}
+    for name in sorted(os.listdir(static_dir)):
+        path = os.path.join(static_dir, name)
+        if os.path.isfile(path) and os.path.splitext(name)[1] in TYPES:
+            with open(path, 'rb') as f:
+                out[name] = f.read()
+    return out
+
+
+def _hashed(name, data):
+    stem, ext = os.path.splitext(name)
+    return f"{DIST}/{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+
+
+def build(static_dir=STATIC_DIR):
+    """Write static/dist/ and its manifest; returns the manifest."""
+    dist = os.path.join(static_dir, DIST)
+    os.makedirs(dist, exist_ok=True)
+    manifest, keep = {}, {'manifest.json'}
+    for name, data in _sources(static_dir).items():
+        path = _hashed(name, data)
+        files = {path: data}
+        encodings = []
+        for coding in compress.ENCODINGS:
+            packed = compress.encode(data, coding, best=True)
+            if len(packed) < len(data):
+                files[path + SUFFIX[coding]] = packed
+                encodings.append(coding)
+        for rel, content in files.items():
+            with open(os.path.join(static_dir, rel), 'wb') as f:
+                f.write(content)
+            keep.add(os.path.basename(rel))
+        manifest[name] = {'path': path, 'encodings': encodings}
+
+    # Old hashes are unreachable once the manifest moves on
+    for stale in set(os.listdir(dist)) - keep:
+        os.remove(os.path.join(dist, stale))
+    with open(os.path.join(dist, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load(static_dir=STATIC_DIR):
+    """Use the built manifest, rebuilding it first if any source changed."""
+    global _manifest, _by_path
+    try:
+        with open(os.path.join(static_dir, DIST, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    current = {name: _hashed(name, data) for name, data in _sources(static_dir).items()}
+    if {name: entry['path'] for name, entry in manifest.items()} != current:
+        try:
+            manifest = build(static_dir)
+            log.info("[Assets] Built %s hashed static files", len(manifest))
+        except OSError as e:
+            log.warning("[Assets] Can't build %s (%s) — serving plain static files", DIST, e)
+            manifest = {}
+
+    _manifest = manifest
+    _by_path  = {entry['path']: {**entry, 'mimetype': mimetypes.guess_type(name)[0]}
+                 for name, entry in manifest.items()}
+    return manifest
+
+
+def url(filename):
+    """The hashed name to link for a static file, or filename if it wasn't built."""
+    entry = _manifest.get(filename)
+    return entry['path'] if entry else filename
+
+
+def lookup(path):
+    """{'path', 'encodings', 'mimetype'} for a hashed static path, else None."""
+    return _by_path.get(path)
+
+
+def main(argv):
+    manifest = build()
+    for name, entry in sorted(manifest.items()):
+        print(f"{name:<22} → {entry['path']}  [{', '.join(entry['encodings']) or 'raw'}]")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,143 @@
+"""
+extract_modes.py — yt-dlp extraction throughput, thread mode vs process mode.
+
+Drives ytpool.extract() directly with concurrent callers, once with
+extractions in the calling threads (VIEWTUBE_YTDLP_MODE=thread) and once
+in the worker pool (process). extract_info() is replaced by a fixture
+that sleeps --upstream-ms (the network wait, which threads overlap fine)
+and json-parses a --parse-kb page (the CPU part, which they don't). The
+real YoutubeDL construction stays in, since that is CPU too.
+
+  python bench/extract_modes.py
+  python bench/extract_modes.py --op video -n 200 -c 16 --processes 8
+  python bench/extract_modes.py --parse-kb 0 --upstream-ms 300   # pure I/O wait
+
+Process mode only wins with spare cores — compare against the cpu count
+printed in the header.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ.setdefault('VIEWTUBE_LOG_LEVEL', 'WARNING')
+
+import fixtures   # noqa: E402
+import yt_dlp     # noqa: E402
+import ytpool     # noqa: E402
+
+OPS = {
+    'search': ('flat',  lambda i: f"ytsearch20:extract bench {i % 50}"),
+    'video':  ('video', lambda i: f"https://www.youtube.com/watch?v=bench{i % 50:06d}"),
+}
+
+
+def _page(kb):
+    """A JSON document of roughly kb KB, shaped like ytInitialData (nested renderers)."""
+    item = {"videoRenderer": {"videoId": "x" * 11, "title": {"runs": [{"text": "t" * 60}]},
+                              "thumbnail": {"thumbnails": [{"url": "u" * 90, "width": 360}] * 4},
+                              "viewCountText": {"simpleText": "1,234,567 views"}}}
+    one = len(json.dumps(item))
+    return json.dumps({"contents": [item] * max(1, kb * 1024 // one)}) if kb else ''
+
+
+def _install(upstream_ms, parse_kb):
+    page  = _page(parse_kb)
+    delay = upstream_ms / 1000.0
+
+    def fake_extract_info(self, url, download=True, *args, **kwargs):
+        if delay:
+            time.sleep(delay)
+        if page:
+            json.loads(page)
+        return fixtures.ytdlp_result(url, self.params)
+
+    yt_dlp.YoutubeDL.extract_info = fake_extract_info
+    # fork so the workers inherit the patched extract_info
+    ytpool.START_METHOD = 'fork'
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, round(p / 100 * (len(sorted_values) - 1)))]
+
+
+def run_mode(mode, op, requests, concurrency):
+    ytpool.MODE = mode
+    ytpool.prestart()
+    shape, url_for = OPS[op]
+    opts = {'quiet': True, 'no_warnings': True, 'extract_flat': shape == 'flat'}
+
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    todo = iter(range(requests))
+
+    def worker():
+        nonlocal errors
+        for i in todo:
+            start = time.perf_counter()
+            try:
+                ok = bool(ytpool.extract(url_for(i), opts, shape))
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                errors += not ok
+
+    cpu = time.process_time()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    wall = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+
+    latencies.sort()
+    return {
+        'mode':    mode,
+        'p50_ms':  _percentile(latencies, 50) * 1000,
+        'p95_ms':  _percentile(latencies, 95) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'rps':     len(latencies) / wall,
+        'main_cpu_pct': cpu / wall * 100,   # GIL holder time in the server process
+        'errors':  errors,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="yt-dlp extraction throughput: thread vs process mode.")
+    ap.add_argument('--op', choices=list(OPS), default='search')
+    ap.add_argument('-n', '--requests', type=int, default=120)
+    ap.add_argument('-c', '--concurrency', type=int, default=8)
+    ap.add_argument('--processes', type=int, default=os.cpu_count(), help='worker processes')
+    ap.add_argument('--upstream-ms', type=float, default=150.0, help='simulated network wait')
+    ap.add_argument('--parse-kb', type=int, default=800, help='JSON parsed per extraction (CPU)')
+    args = ap.parse_args(argv)
+
+    _install(args.upstream_ms, args.parse_kb)
+    ytpool.PROCESSES = args.processes
+
+    print(f"{args.op}: {args.requests} extractions, {args.concurrency} callers, "
+          f"{args.processes} workers, {os.cpu_count()} cpus, "
+          f"{args.upstream_ms:.0f} ms wait + {args.parse_kb} KB parse each")
+    print(f"{'mode':<10}{'p50':>9}{'p95':>9}{'mean':>9}{'req/s':>9}{'main cpu':>10}{'err':>5}")
+    for mode in ('thread', 'process'):
+        r = run_mode(mode, args.op, args.requests, args.concurrency)
+        print(f"{r['mode']:<10}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['mean_ms']:>9.1f}"
+              f"{r['rps']:>9.1f}{r['main_cpu_pct']:>9.0f}%{r['errors']:>5}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+failover.py — Load driver for the Invidious tier against local fakes.
+
+Starts fake_invidious instances with a fault scenario, points
+invidious.INVIDIOUS_INSTANCES at them and fires concurrent calls through
+the real invidious.py code (_try_instances, failover, converters), each
+under a request deadline like a route would run it. Reports end-to-end
+latency, success rate, throughput and how many upstream attempts each
+call cost.
+
+  python bench/failover.py                           # every scenario
+  python bench/failover.py first-hangs -n 200 -c 16
+  python bench/failover.py --op video --budget 9 --probe
+
+Scenarios (mirror order = INVIDIOUS_INSTANCES order):
+  healthy      three fast mirrors
+  first-dead   mirror 1 refuses connections
+  first-hangs  mirror 1 accepts and never answers
+  first-slow   mirror 1 trickles its body out
+  flaky        every mirror fails 30% of requests
+  brownout     every mirror slow and heavy-tailed, 5% hangs
+
+--probe runs one netprobe sweep first, so ordering follows the prober
+the way it does in production.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ.setdefault('VIEWTUBE_LOG_LEVEL', 'WARNING')
+
+import fake_invidious  # noqa: E402
+import deadline        # noqa: E402
+import invidious       # noqa: E402
+import netprobe        # noqa: E402
+
+HEALTHY = dict(latency='lognormal:40:0.4')
+
+SCENARIOS = {
+    'healthy':     [HEALTHY, HEALTHY, HEALTHY],
+    'first-dead':  [None, HEALTHY, HEALTHY],
+    'first-hangs': [dict(hang_rate=1.0), HEALTHY, HEALTHY],
+    'first-slow':  [dict(slow_rate=1.0, slow_chunk_ms=400), HEALTHY, HEALTHY],
+    'flaky':       [dict(HEALTHY, error_rate=0.3)] * 3,
+    'brownout':    [dict(latency='lognormal:400:0.9', hang_rate=0.05)] * 3,
+}
+
+OPS = {
+    'search':   lambda i: invidious.search(f"failover query {i % 50}"),
+    'video':    lambda i: invidious.get_video_info(f"vid{i % 50:08d}"),
+    'channel':  lambda i: invidious.get_channel(f"UCfailover{i % 20:014d}")[0],
+    'playlist': lambda i: invidious.get_playlist(f"PLfailover{i % 20:024d}")[0],
+}
+
+
+def _dead_url():
+    """A local port nothing listens on — connections are refused immediately."""
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return f"http://127.0.0.1:{port}"
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, round(p / 100 * (len(sorted_values) - 1)))]
+
+
+def run_scenario(name, op, requests, concurrency, budget, probe):
+    servers, urls = [], []
+    for profile in SCENARIOS[name]:
+        if profile is None:
+            urls.append(_dead_url())
+            servers.append(None)
+        else:
+            server = fake_invidious.start(**profile)
+            urls.append(server.url)
+            servers.append(server)
+
+    invidious.PIPED_INSTANCES     = []
+    invidious.INVIDIOUS_INSTANCES = urls
+    invidious._inv_instance       = None
+    netprobe._targets.clear()
+    netprobe._snapshot = {'at': 0, 'targets': {}}
+    if probe:
+        netprobe._targets.update(invidious.probe_targets())
+        netprobe.sweep()
+
+    call = OPS[op]
+    latencies, ok = [], 0
+    lock = threading.Lock()
+    todo = iter(range(requests))
+
+    def worker():
+        nonlocal ok
+        for i in todo:
+            deadline.start(budget)
+            start = time.perf_counter()
+            try:
+                result = call(i)
+            except Exception:
+                result = None
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                ok += bool(result)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    wall = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall
+
+    hits = [s.hits if s else 0 for s in servers]
+    for s in servers:
+        if s:
+            s.stop()
+
+    latencies.sort()
+    return {
+        'scenario': name,
+        'p50_ms':   _percentile(latencies, 50) * 1000,
+        'p95_ms':   _percentile(latencies, 95) * 1000,
+        'p99_ms':   _percentile(latencies, 99) * 1000,
+        'mean_ms':  statistics.fmean(latencies) * 1000,
+        'success':  ok / len(latencies),
+        'rps':      len(latencies) / wall,
+        'attempts': sum(hits) / len(latencies),
+        'hits':     hits,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Invidious-tier failover load driver.")
+    ap.add_argument('scenarios', nargs='*', metavar='scenario',
+                    help=f"default: all of {', '.join(SCENARIOS)}")
+    ap.add_argument('--op', choices=list(OPS), default='search')
+    ap.add_argument('-n', '--requests', type=int, default=100)
+    ap.add_argument('-c', '--concurrency', type=int, default=8)
+    ap.add_argument('--budget', type=float, default=9.0, help='per-call deadline (REQUEST_BUDGET)')
+    ap.add_argument('--probe', action='store_true', help='run a netprobe sweep before the load')
+    args = ap.parse_args(argv)
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        ap.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    print(f"{'scenario':<13}{'p50':>8}{'p95':>8}{'p99':>8}{'ok':>7}{'req/s':>8}{'tries':>7}  hits per mirror")
+    for name in args.scenarios or list(SCENARIOS):
+        r = run_scenario(name, args.op, args.requests, args.concurrency, args.budget, args.probe)
+        print(f"{r['scenario']:<13}{r['p50_ms']:>8.0f}{r['p95_ms']:>8.0f}{r['p99_ms']:>8.0f}"
+              f"{r['success']:>7.0%}{r['rps']:>8.1f}{r['attempts']:>7.2f}  {r['hits']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+fake_invidious.py — Local Invidious stand-in with injectable faults.
+
+Serves the /api/v1/search, /videos/<id>, /channels/<id>[/videos],
+/playlists/<id> and /stats shapes from fixtures.py, so _try_instances,
+mirror failover and the invidious.py converters can be exercised without
+public mirrors. Every instance has a fault profile:
+
+  latency     '0' | '80' (fixed ms) | 'uniform:20:200' | 'lognormal:80:0.6'
+              (median ms, sigma) | 'exp:100' (mean ms)
+  error_rate  fraction answered with HTTP 500
+  hang_rate   fraction that never answer (held open for `hang` seconds)
+  slow_rate   fraction whose body trickles out in chunks, `slow_chunk_ms` apart
+
+  python bench/fake_invidious.py --port 3001 --latency lognormal:80:0.6 --error-rate 0.1
+
+or from Python (see failover.py):
+
+  server = fake_invidious.start(latency='uniform:20:80', hang_rate=0.05)
+  ... server.url ...
+  server.stop()
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fixtures  # noqa: E402
+
+
+def parse_latency(spec):
+    """Latency spec → zero-arg function returning seconds."""
+    spec = str(spec or '0')
+    kind, _, rest = spec.partition(':')
+    args = [float(a) for a in rest.split(':')] if rest else []
+    if not rest:
+        fixed = float(kind) / 1000
+        return lambda: fixed
+    if kind == 'uniform':
+        lo, hi = args
+        return lambda: random.uniform(lo, hi) / 1000
+    if kind == 'lognormal':
+        median, sigma = args
+        return lambda: random.lognormvariate(math.log(median), sigma) / 1000
+    if kind == 'exp':
+        (mean,) = args
+        return lambda: random.expovariate(1 / mean) / 1000
+    raise ValueError(f"bad latency spec {spec!r}")
+
+
+class Profile:
+    def __init__(self, latency='0', error_rate=0.0, hang_rate=0.0, slow_rate=0.0,
+                 hang=30.0, slow_chunks=8, slow_chunk_ms=500):
+        self.latency       = parse_latency(latency)
+        self.latency_spec  = latency
+        self.error_rate    = error_rate
+        self.hang_rate     = hang_rate
+        self.slow_rate     = slow_rate
+        self.hang          = hang
+        self.slow_chunks   = slow_chunks
+        self.slow_chunk_ms = slow_chunk_ms
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass   # the load driver reports outcomes; keep stdout clean
+
+    def do_GET(self):
+        server  = self.server
+        profile = server.profile
+        with server.lock:
+            server.hits += 1
+
+        roll = random.random()
+        if roll < profile.hang_rate:
+            time.sleep(profile.hang)
+            self.close_connection = True
+            return
+
+        time.sleep(profile.latency())
+
+        if roll < profile.hang_rate + profile.error_rate:
+            self._send(500, b'{"error":"injected failure"}')
+            return
+
+        try:
+            body = json.dumps(fixtures.invidious_json(self.path)).encode()
+        except ValueError as e:
+            self._send(404, json.dumps({"error": str(e)}).encode())
+            return
+
+        if roll < profile.hang_rate + profile.error_rate + profile.slow_rate:
+            self._send_slow(body, profile)
+        else:
+            self._send(200, body)
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_slow(self, body, profile):
+        """Headers now, body in slow_chunks pieces — each read stays under the socket timeout."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        step = max(1, len(body) // profile.slow_chunks)
+        try:
+            for i in range(0, len(body), step):
+                self.wfile.write(body[i:i + step])
+                self.wfile.flush()
+                time.sleep(profile.slow_chunk_ms / 1000)
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # client gave up — that's the point
+
+
+class FakeInvidious(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port, profile):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.profile = profile
+        self.hits    = 0
+        self.lock    = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def start(port=0, **profile):
+    """Start an instance in a background thread (port=0 picks a free one)."""
+    server = FakeInvidious(port, Profile(**profile))
+    server._thread = threading.Thread(target=server.serve_forever, name=f"fake-inv-{port}", daemon=True)
+    server._thread.start()
+    return server
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local Invidious stand-in with fault injection.")
+    ap.add_argument('--port', type=int, default=3000)
+    ap.add_argument('--latency', default='0')
+    ap.add_argument('--error-rate', type=float, default=0.0)
+    ap.add_argument('--hang-rate', type=float, default=0.0)
+    ap.add_argument('--slow-rate', type=float, default=0.0)
+    ap.add_argument('--hang', type=float, default=30.0, help='seconds a hung request is held')
+    ap.add_argument('--slow-chunk-ms', type=float, default=500)
+    args = ap.parse_args(argv)
+
+    server = FakeInvidious(args.port, Profile(
+        latency=args.latency, error_rate=args.error_rate, hang_rate=args.hang_rate,
+        slow_rate=args.slow_rate, hang=args.hang, slow_chunk_ms=args.slow_chunk_ms))
+    print(f"fake invidious on {server.url} (latency {args.latency}, errors {args.error_rate:.0%}, "
+          f"hangs {args.hang_rate:.0%}, slow bodies {args.slow_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+fixtures.py — Canned upstream responses for the replay benchmark.
+
+Shaped like real yt-dlp extract_info() results, Invidious API JSON,
+YouTube channel feeds and suggestqueries answers — same keys, realistic
+sizes (20-odd formats per video, 15-entry feeds, 120-video playlists) —
+but generated deterministically from the request, so every run replays
+identical data without touching the network.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import urllib.parse
+
+PLAYLIST_LENGTH = 120
+CHANNEL_LENGTH  = 300
+
+
+def _vid(*seed):
+    """Stable 11-char YouTube-style id."""
+    digest = hashlib.md5(":".join(map(str, seed)).encode()).digest()
+    return base64.urlsafe_b64encode(digest).decode()[:11]
+
+
+def _channel_id(name):
+    return "UC" + _vid("channel", name) + _vid("channel2", name)[:11]
+
+
+def _flat_entry(video_id, n, channel="Bench Channel"):
+    return {
+        "_type":       "url",
+        "ie_key":      "Youtube",
+        "id":          video_id,
+        "url":         f"https://www.youtube.com/watch?v={video_id}",
+        "title":       f"Benchmark video {n}: building a {['parser', 'cache', 'scheduler', 'compiler'][n % 4]} from scratch",
+        "duration":    180 + n * 37 % 3000,
+        "view_count":  1000 + n * 7919,
+        "channel":     channel,
+        "channel_id":  _channel_id(channel),
+        "uploader":    channel,
+        "thumbnails":  [{"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg", "height": 360, "width": 480}],
+        "upload_date": f"2025{1 + n % 12:02d}{1 + n % 28:02d}",
+    }
+
+
+def _window(opts, total):
+    start = (opts.get("playliststart") or 1) - 1
+    end   = opts.get("playlistend") or total
+    return range(start, min(end, total))
+
+
+# ─────────────────────────────────────────────────────────────────────
+# yt-dlp
+# ─────────────────────────────────────────────────────────────────────
+
+def ytdlp_result(url, opts):
+    """What YoutubeDL(opts).extract_info(url) would return."""
+    m = re.match(r"ytsearch(\d+):(.*)", url)
+    if m:
+        count, query = int(m.group(1)), m.group(2)
+        return {
+            "_type":   "playlist",
+            "id":      query,
+            "title":   query,
+            "entries": [_flat_entry(_vid(query, i), i, f"Channel {i % 5}") for i in range(count)],
+        }
+
+    m = re.search(r"[?&]list=([\w-]+)", url)
+    if m:
+        playlist_id = m.group(1)
+        return {
+            "_type":          "playlist",
+            "id":             playlist_id,
+            "title":          f"Benchmark playlist {playlist_id[:6]}",
+            "description":    "A long course playlist used by the replay benchmark.",
+            "uploader":       "Bench Channel",
+            "channel_id":     _channel_id("Bench Channel"),
+            "playlist_count": PLAYLIST_LENGTH,
+            "entries":        [_flat_entry(_vid(playlist_id, i), i) for i in _window(opts, PLAYLIST_LENGTH)],
+        }
+
+    m = re.search(r"[?&]v=([\w-]+)", url)
+    if m:
+        return video_info(m.group(1))
+
+    m = re.search(r"youtube\.com/(?:channel/)?([\w@-]+)(/videos)?", url)
+    if m:
+        channel_id, tab = m.group(1), m.group(2)
+        result = {
+            "_type":       "playlist",
+            "id":          channel_id,
+            "channel":     "Bench Channel",
+            "uploader":    "Bench Channel",
+            "channel_id":  channel_id,
+            "description": "Channel used by the replay benchmark.",
+            "thumbnails":  [{"url": f"https://yt3.ggpht.com/{channel_id}=s{s}", "height": s, "width": s}
+                            for s in (88, 176, 900)],
+            "entries":     [],
+        }
+        if tab:
+            result["entries"] = [_flat_entry(_vid(channel_id, i), i) for i in _window(opts, CHANNEL_LENGTH)]
+        return result
+
+    raise ValueError(f"no fixture for {url}")
+
+
+def video_info(video_id):
+    """Full (non-flat) extraction result — the expensive one in production."""
+    formats = []
+    for i, (height, ext, vcodec, acodec) in enumerate([
+        (144, "mp4", "avc1", "none"), (240, "mp4", "avc1", "none"), (360, "mp4", "avc1", "mp4a"),
+        (360, "webm", "vp9", "none"), (480, "mp4", "avc1", "none"), (480, "webm", "vp9", "none"),
+        (720, "mp4", "avc1", "none"), (720, "webm", "vp9", "none"), (1080, "mp4", "avc1", "none"),
+        (1080, "webm", "vp9", "none"), (1440, "webm", "vp9", "none"), (2160, "webm", "vp9", "none"),
+        (None, "m4a", "none", "mp4a"), (None, "m4a", "none", "mp4a"), (None, "webm", "none", "opus"),
+        (None, "webm", "none", "opus"), (None, "webm", "none", "opus"), (360, "3gp", "mp4v", "mp4a"),
+        (720, "mp4", "avc1", "mp4a"), (144, "mp4", "av01", "none"), (1080, "mp4", "av01", "none"),
+    ]):
+        formats.append({
+            "format_id": str(100 + i),
+            "url":       f"https://rr1---sn-bench.googlevideo.com/videoplayback?id={video_id}&itag={100 + i}",
+            "ext":       ext,
+            "height":    height,
+            "width":     height and height * 16 // 9,
+            "vcodec":    vcodec,
+            "acodec":    acodec,
+            "tbr":       (height or 64) * 3.1,
+            "filesize":  (height or 100) * 91_000,
+        })
+    return {
+        "id":          video_id,
+        "title":       f"Benchmark watch page {video_id}",
+        "uploader":    "Bench Channel",
+        "uploader_url": "https://www.youtube.com/@bench",
+        "channel_id":  _channel_id("Bench Channel"),
+        "view_count":  1_234_567,
+        "like_count":  45_678,
+        "upload_date": "20250914",
+        "duration":    1234,
+        "description": "Replay fixture. " * 200,
+        "thumbnail":   f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg",
+        "thumbnails":  [{"url": f"https://i.ytimg.com/vi/{video_id}/{n}.jpg"} for n in range(40)],
+        "formats":     formats,
+        "tags":        [f"tag{n}" for n in range(30)],
+        "chapters":    [{"start_time": n * 60, "title": f"Part {n}"} for n in range(20)],
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Invidious API
+# ─────────────────────────────────────────────────────────────────────
+
+def _inv_video(video_id, n, author="Bench Channel"):
+    return {
+        "type":          "video",
+        "videoId":       video_id,
+        "title":         f"Benchmark video {n}",
+        "author":        author,
+        "authorId":      _channel_id(author),
+        "lengthSeconds": 180 + n * 37 % 3000,
+        "viewCount":     1000 + n * 7919,
+        "videoThumbnails": [{"quality": q, "url": f"https://i.ytimg.com/vi/{video_id}/{q}.jpg"}
+                            for q in ("maxres", "high", "medium", "default")],
+    }
+
+
+def invidious_json(url):
+    """Parsed JSON an Invidious instance would answer url with."""
+    parts  = urllib.parse.urlsplit(url)
+    path   = parts.path
+    params = dict(urllib.parse.parse_qsl(parts.query))
+
+    if path == "/api/v1/search":
+        q = params.get("q", "")
+        return [_inv_video(_vid(q, i), i, f"Channel {i % 5}") for i in range(20)]
+
+    m = re.match(r"/api/v1/videos/([\w-]+)", path)
+    if m:
+        video_id = m.group(1)
+        return {
+            **_inv_video(video_id, 1),
+            "description":      "Replay fixture. " * 200,
+            "likeCount":        45_678,
+            "authorThumbnails": [{"url": f"https://yt3.ggpht.com/bench=s{s}", "width": s} for s in (32, 100, 176)],
+            "formatStreams":    [{"container": "mp4", "url": f"https://bench.invalid/{video_id}.mp4",
+                                  "resolution": r} for r in ("360p", "720p")],
+            "adaptiveFormats":  [{"container": "webm", "url": f"https://bench.invalid/{video_id}/{i}"}
+                                 for i in range(18)],
+        }
+
+    m = re.match(r"/api/v1/channels/([\w@-]+)/videos", path)
+    if m:
+        channel_id = m.group(1)
+        page = int(params.get("continuation", "0") or 0)
+        videos = [_inv_video(_vid(channel_id, page * 30 + i), page * 30 + i) for i in range(30)]
+        return {"videos": videos, "continuation": str(page + 1) if page < 9 else None}
+
+    m = re.match(r"/api/v1/channels/([\w@-]+)", path)
+    if m:
+        channel_id = m.group(1)
+        return {
+            "author":           "Bench Channel",
+            "authorId":         channel_id,
+            "authorThumbnails": [{"url": f"https://yt3.ggpht.com/{channel_id}=s{s}", "width": s} for s in (32, 100, 176)],
+            "latestVideos":     [_inv_video(_vid(channel_id, i), i) for i in range(30)],
+        }
+
+    m = re.match(r"/api/v1/playlists/([\w-]+)", path)
+    if m:
+        playlist_id = m.group(1)
+        page = int(params.get("page", 1))
+        start = (page - 1) * 100
+        return {
+            "title":       f"Benchmark playlist {playlist_id[:6]}",
+            "description": "A long course playlist used by the replay benchmark.",
+            "author":      "Bench Channel",
+            "authorId":    _channel_id("Bench Channel"),
+            "videoCount":  PLAYLIST_LENGTH,
+            "videos":      [_inv_video(_vid(playlist_id, i), i) for i in range(start, min(start + 100, PLAYLIST_LENGTH))],
+        }
+
+    if path == "/api/v1/stats":
+        return {"software": {"name": "invidious"}}
+
+    raise ValueError(f"no fixture for {url}")
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Plain HTTP — channel feed and search suggestions
+# ─────────────────────────────────────────────────────────────────────
+
+def channel_feed(channel_id):
+    """YouTube channel Atom feed (15 latest uploads)."""
+    entries = []
+    for i in range(15):
+        video_id = _vid(channel_id, i)
+        entries.append(f"""
+  <entry>
+    <yt:videoId>{video_id}</yt:videoId>
+    <title>Benchmark video {i}</title>
+    <published>2025-09-{1 + i:02d}T12:00:00+00:00</published>
+    <media:group>
+      <media:thumbnail url="https://i.ytimg.com/vi/{video_id}/hqdefault.jpg" width="480" height="360"/>
+      <media:community><media:statistics views="{1000 + i * 7919}"/></media:community>
+    </media:group>
+  </entry>""")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">
+  <title>Bench Channel</title>
+  <author><name>Bench Channel</name></author>{''.join(entries)}
+</feed>""".encode()
+
+
+def suggestions(query):
+    """suggestqueries.google.com client=firefox answer: [query, [suggestions...]]."""
+    return json.dumps([query, [f"{query} {s}" for s in
+                               ("tutorial", "course", "project", "explained", "for beginners",
+                                "interview", "vs", "roadmap", "crash course", "2025")]]).encode()
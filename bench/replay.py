@@ -0,0 +1,316 @@
+"""
+replay.py — Offline replay benchmark for every ViewTube route.
+
+yt-dlp extract_info(), Invidious _http_get() and resolver.urlopen() (channel
+feeds, suggestions) are swapped for canned responses from fixtures.py, the
+background prober is kept from starting, and each route is driven through
+Flask's test client. Nothing touches the network, so numbers only move
+when our own code changes.
+
+Each route runs in its own child process so peak RSS is per route.
+
+  python bench/replay.py                          # all routes, yt-dlp tier
+  python bench/replay.py --tier invidious -n 200 -c 8
+  python bench/replay.py --save bench/baseline.json
+  python bench/replay.py --compare bench/baseline.json --tolerance 0.2
+
+--compare exits 1 when any route's p95, throughput or peak RSS regressed
+by more than the tolerance, so it can gate a deploy.
+
+By default every request is cold (caches and per-process state reset
+first), which measures the full fetch → parse → render path; --warm
+measures cache hits instead. --upstream-ms adds a fixed delay to every
+replayed upstream call.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+# route name → URL (fixture ids are arbitrary, they only seed the generators)
+ROUTES = {
+    'home':           '/',
+    'search':         '/search?q=rust+async+runtime',
+    'search-more':    '/api/search-more?q=rust+async+runtime&offset=10',
+    'watch':          '/watch?v=dQw4w9WgXcQ',
+    'channel':        '/channel/UCbenchBENCHbenchBENCHbe',
+    'playlist':       '/playlist/PLbenchBENCHbenchBENCHbenchBENCHbe',
+    'trending':       '/api/trending',
+    'channel-avatar': '/api/channel-avatar?channel_id=UCbenchBENCHbenchBENCHbe',
+    'autocomplete':   '/api/autocomplete?q=rust',
+}
+
+# Per-process state index.py keeps outside the shared cache
+_INDEX_STATE = ('_channel_inflight', '_suggest_merged', '_suggest_inflight')
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Replay layer
+# ─────────────────────────────────────────────────────────────────────
+
+class _FakeResponse:
+    def __init__(self, body, headers=None):
+        self._body = body
+        self.headers = headers or {}
+        self.status = 200
+
+    def read(self, n=-1):
+        return self._body if n < 0 else self._body[:n]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _install(tier, upstream_ms):
+    """Swap every network call for a fixture; returns the imported index module."""
+    os.environ.setdefault('VIEWTUBE_WARMUP', '0')
+    os.environ.setdefault('VIEWTUBE_CACHE', 'memory')
+    os.environ.setdefault('VIEWTUBE_LOG_LEVEL', 'WARNING')
+    scratch = tempfile.mkdtemp(prefix='viewtube-bench-')
+    atexit.register(shutil.rmtree, scratch, ignore_errors=True)
+    os.environ['VIEWTUBE_INDEX']     = os.path.join(scratch, 'index.sqlite3')
+    os.environ['VIEWTUBE_SNAPSHOTS'] = os.path.join(scratch, 'snapshots.sqlite3')
+    os.environ.pop('VERCEL', None)
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, HERE)
+
+    import fixtures
+    import netprobe
+    import resolver
+    import yt_dlp
+
+    delay = upstream_ms / 1000.0
+
+    def fake_extract_info(self, url, download=True, *args, **kwargs):
+        if delay:
+            time.sleep(delay)
+        return fixtures.ytdlp_result(url, self.params)
+
+    def fake_urlopen(req, *args, **kwargs):
+        url = req.full_url if isinstance(req, urllib.request.Request) else req
+        if delay:
+            time.sleep(delay)
+        if 'feeds/videos.xml' in url:
+            channel_id = url.rsplit('channel_id=', 1)[-1]
+            return _FakeResponse(fixtures.channel_feed(channel_id), {'ETag': '"bench"'})
+        if 'suggestqueries' in url:
+            query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get('q', [''])[0]
+            return _FakeResponse(fixtures.suggestions(query))
+        raise urllib.error.URLError('network disabled by replay benchmark')
+
+    yt_dlp.YoutubeDL.extract_info = fake_extract_info
+    urllib.request.urlopen = fake_urlopen
+    resolver.urlopen = fake_urlopen
+    netprobe.start = lambda targets: None     # never probe for real
+
+    import invidious
+
+    def fake_http_get(url):
+        if delay:
+            time.sleep(delay)
+        return fixtures.invidious_json(url)
+
+    invidious._http_get = fake_http_get
+
+    import index
+
+    # Pin the tier the way a real probe sweep would
+    targets = {name: {'ok': True, 'latency': 0.05, 'error': ''} for name in index.PROBE_TARGETS}
+    if tier == 'invidious':
+        targets['youtube'] = {'ok': False, 'latency': None, 'error': 'replay'}
+    netprobe._snapshot = {'at': time.time(), 'targets': targets}
+    return index
+
+
+def _reset(index):
+    import cache
+    cache.clear()
+    for name in _INDEX_STATE:
+        state = getattr(index, name, None)
+        if state is not None:
+            state.clear()
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Measurement
+# ─────────────────────────────────────────────────────────────────────
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def run_route(name, tier, requests, concurrency, warmup, warm, upstream_ms):
+    """Benchmark one route in this process. Returns a result dict."""
+    index = _install(tier, upstream_ms)
+    app   = index.app
+    url   = ROUTES[name]
+    lock  = threading.Lock()
+
+    def one():
+        if not warm:
+            with lock:
+                _reset(index)
+        client = app.test_client()
+        start = time.perf_counter()
+        resp = client.get(url)
+        elapsed = time.perf_counter() - start
+        return elapsed, resp.status_code
+
+    for _ in range(warmup):
+        one()
+
+    latencies, errors = [], 0
+    todo = iter(range(requests))
+
+    def worker():
+        nonlocal errors
+        for _ in todo:
+            elapsed, status = one()
+            with lock:
+                latencies.append(elapsed)
+                if status >= 500:
+                    errors += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    wall = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall
+
+    latencies.sort()
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss_kb //= 1024     # bytes there, KiB on Linux
+    return {
+        'route':      name,
+        'requests':   len(latencies),
+        'errors':     errors,
+        'p50_ms':     _percentile(latencies, 50) * 1000,
+        'p95_ms':     _percentile(latencies, 95) * 1000,
+        'p99_ms':     _percentile(latencies, 99) * 1000,
+        'mean_ms':    statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        'rps':        len(latencies) / wall if wall else 0.0,
+        'peak_rss_mb': rss_kb / 1024,
+    }
+
+
+def _child(name, args):
+    """Run one route in a fresh interpreter and return its result."""
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', name,
+           '--tier', args.tier, '-n', str(args.requests), '-c', str(args.concurrency),
+           '--warmup', str(args.warmup), '--upstream-ms', str(args.upstream_ms)]
+    if args.warm:
+        cmd.append('--warm')
+    out = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+    if out.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{out.stderr[-2000:]}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Baseline comparison
+# ─────────────────────────────────────────────────────────────────────
+
+def compare(results, baseline, tolerance):
+    """Regressions as human-readable strings (empty list = pass)."""
+    base = {r['route']: r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        b = base.get(r['route'])
+        if not b:
+            continue
+        if r['p95_ms'] > b['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{r['route']}: p95 {b['p95_ms']:.1f} → {r['p95_ms']:.1f} ms")
+        if r['rps'] < b['rps'] * (1 - tolerance):
+            regressions.append(f"{r['route']}: throughput {b['rps']:.0f} → {r['rps']:.0f} req/s")
+        if r['peak_rss_mb'] > b['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{r['route']}: peak RSS {b['peak_rss_mb']:.0f} → {r['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def _print_table(results, baseline=None):
+    base = {r['route']: r for r in (baseline or {}).get('results', [])}
+    print(f"{'route':<16}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'rss MB':>9}{'err':>5}  vs baseline p95")
+    for r in results:
+        delta = ''
+        b = base.get(r['route'])
+        if b and b['p95_ms']:
+            delta = f"{(r['p95_ms'] / b['p95_ms'] - 1) * 100:+.0f}%"
+        print(f"{r['route']:<16}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              f"{r['rps']:>9.0f}{r['peak_rss_mb']:>9.0f}{r['errors']:>5}  {delta}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    ap.add_argument('routes', nargs='*', metavar='route',
+                    help=f"routes to run (default: all of {', '.join(ROUTES)})")
+    ap.add_argument('--tier', choices=('ytdlp', 'invidious'), default='ytdlp')
+    ap.add_argument('-n', '--requests', type=int, default=100)
+    ap.add_argument('-c', '--concurrency', type=int, default=1)
+    ap.add_argument('--warmup', type=int, default=5)
+    ap.add_argument('--warm', action='store_true', help='keep caches between requests')
+    ap.add_argument('--upstream-ms', type=float, default=0.0, help='simulated upstream latency')
+    ap.add_argument('--save', metavar='FILE', help='write results as a new baseline')
+    ap.add_argument('--compare', metavar='FILE', help='compare against a saved baseline')
+    ap.add_argument('--tolerance', type=float, default=0.15, help='allowed regression (0.15 = 15%%)')
+    ap.add_argument('--child', help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    unknown = [r for r in args.routes if r not in ROUTES]
+    if unknown:
+        ap.error(f"unknown route(s): {', '.join(unknown)}")
+
+    if args.child:
+        result = run_route(args.child, args.tier, args.requests, args.concurrency,
+                           args.warmup, args.warm, args.upstream_ms)
+        print(json.dumps(result))
+        return 0
+
+    results = [_child(name, args) for name in (args.routes or list(ROUTES))]
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    _print_table(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'tier': args.tier, 'requests': args.requests, 'concurrency': args.concurrency,
+                       'warm': args.warm, 'results': results}, f, indent=2)
+        print(f"\nbaseline written to {args.save}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESSIONS (> {args.tolerance:.0%}):")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print(f"\nno regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
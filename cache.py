@@ -0,0 +1,253 @@
+"""
+cache.py — Shared cache backend for everything ViewTube memoizes.
+
+In-process dicts start empty in every gunicorn worker and on every Vercel
+cold start, so the same slow extractions get repeated. This module puts
+those entries behind one small get/set API with pluggable storage:
+
+  sqlite  (default) : one file shared by all workers on the host —
+                      WAL mode, expires_at column, periodic purge + vacuum
+  redis             : optional, any Redis-compatible local server
+                      (needs the `redis` package)
+  memory            : plain dict, per process (fallback)
+
+Selected with VIEWTUBE_CACHE:
+  VIEWTUBE_CACHE=sqlite:///var/tmp/viewtube.sqlite3
+  VIEWTUBE_CACHE=redis://localhost:6379/0
+  VIEWTUBE_CACHE=memory
+
+Values must be JSON-serialisable. Every entry lives in a namespace
+('trending', 'search', 'video', 'avatar', 'suggest', ...).
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import metrics
+import logs
+
+log = logs.get('cache')
+
+DEFAULT_PATH    = os.path.join(tempfile.gettempdir(), "viewtube-cache.sqlite3")
+PURGE_INTERVAL  = 300    # seconds between deletes of expired rows
+VACUUM_INTERVAL = 3600   # seconds between VACUUMs (reclaims file space)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Backends — all expose get / set / delete / clear
+# ─────────────────────────────────────────────────────────────────────
+
+class MemoryCache:
+    """Per-process dict backend: {(ns, key): (expires_at, value)}."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, ns, key):
+        entry = self._data.get((ns, key))
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            with self._lock:
+                self._data.pop((ns, key), None)
+            metrics.cache_evictions.inc(self.name, ns, 'expired')
+            return None
+        return value
+
+    def set(self, ns, key, value, ttl):
+        with self._lock:
+            self._data[(ns, key)] = (time.time() + ttl, value)
+
+    def delete(self, ns, key):
+        with self._lock:
+            self._data.pop((ns, key), None)
+
+    def clear(self, ns=None):
+        with self._lock:
+            if ns is None:
+                self._data.clear()
+            else:
+                for k in [k for k in self._data if k[0] == ns]:
+                    del self._data[k]
+
+
+class SQLiteCache:
+    """
+    File-backed backend shared by every process on the host.
+    WAL lets readers in other workers proceed while one worker writes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False,
+                                     isolation_level=None)   # autocommit
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "  ns         TEXT NOT NULL,"
+            "  key        TEXT NOT NULL,"
+            "  value      TEXT NOT NULL,"
+            "  created_at REAL NOT NULL,"
+            "  expires_at REAL NOT NULL,"
+            "  PRIMARY KEY (ns, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires_at)")
+        self._last_purge  = time.time()
+        self._last_vacuum = time.time()
+
+    def get(self, ns, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE ns = ? AND key = ? AND expires_at >= ?",
+                (ns, key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, ns, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (ns, key, value, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (ns, key, json.dumps(value), now, now + ttl),
+            )
+        self._maintain(now)
+
+    def delete(self, ns, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE ns = ? AND key = ?", (ns, key))
+
+    def clear(self, ns=None):
+        with self._lock:
+            if ns is None:
+                self._conn.execute("DELETE FROM cache")
+            else:
+                self._conn.execute("DELETE FROM cache WHERE ns = ?", (ns,))
+
+    def _maintain(self, now):
+        """Purge expired rows every PURGE_INTERVAL, VACUUM every VACUUM_INTERVAL."""
+        if now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        try:
+            with self._lock:
+                expired = self._conn.execute(
+                    "SELECT ns, COUNT(*) FROM cache WHERE expires_at < ? GROUP BY ns", (now,)).fetchall()
+                self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+                for ns, count in expired:
+                    metrics.cache_evictions.inc(self.name, ns, 'expired', value=count)
+                if now - self._last_vacuum >= VACUUM_INTERVAL:
+                    self._last_vacuum = now
+                    self._conn.execute("VACUUM")
+        except sqlite3.OperationalError as e:
+            # Another worker holds the write lock — it will do the sweep
+            log.debug("[Cache] SQLite maintenance skipped: %s", e)
+
+
+class RedisCache:
+    """Redis-compatible backend — native TTLs, keys are 'viewtube:<ns>:<key>'."""
+
+    name = "redis"
+
+    def __init__(self, url):
+        import redis   # optional dependency
+        self._r = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._r.ping()
+
+    @staticmethod
+    def _k(ns, key):
+        return f"viewtube:{ns}:{key}"
+
+    def get(self, ns, key):
+        raw = self._r.get(self._k(ns, key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, ns, key, value, ttl):
+        self._r.setex(self._k(ns, key), max(1, int(ttl)), json.dumps(value))
+
+    def delete(self, ns, key):
+        self._r.delete(self._k(ns, key))
+
+    def clear(self, ns=None):
+        pattern = f"viewtube:{ns}:*" if ns else "viewtube:*"
+        for k in self._r.scan_iter(pattern):
+            self._r.delete(k)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Backend selection
+# ─────────────────────────────────────────────────────────────────────
+
+def _make_backend(spec):
+    """Build a backend from a VIEWTUBE_CACHE spec; fall back to memory on any error."""
+    spec = (spec or "").strip()
+    try:
+        if spec == "memory":
+            return MemoryCache()
+        if spec.startswith(("redis://", "rediss://", "unix://")):
+            return RedisCache(spec)
+        path = spec[len("sqlite://"):] if spec.startswith("sqlite://") else DEFAULT_PATH
+        return SQLiteCache(path)
+    except Exception as e:
+        log.warning("[Cache] '%s' backend unavailable (%s), using memory", spec or 'sqlite', e)
+        return MemoryCache()
+
+
+backend = _make_backend(os.environ.get("VIEWTUBE_CACHE"))
+
+
+def configure(spec):
+    """Swap the active backend at runtime (e.g. VIEWTUBE_CACHE=memory for local runs)."""
+    global backend
+    backend = _make_backend(spec)
+    return backend
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Public API — called by index.py
+# A broken backend must never break a request, so every call is guarded.
+# ─────────────────────────────────────────────────────────────────────
+
+def get(ns, key):
+    """Return the cached value, or None on a miss / expired entry."""
+    try:
+        value = backend.get(ns, key)
+    except Exception as e:
+        log.warning("[Cache] get %s:%s failed: %s", ns, key, e)
+        value = None
+    metrics.cache_requests.inc(ns, 'miss' if value is None else 'hit')
+    return value
+
+
+def set(ns, key, value, ttl):
+    """Store a JSON-serialisable value for ttl seconds."""
+    try:
+        backend.set(ns, key, value, ttl)
+    except Exception as e:
+        log.warning("[Cache] set %s:%s failed: %s", ns, key, e)
+
+
+def delete(ns, key):
+    try:
+        backend.delete(ns, key)
+    except Exception as e:
+        log.warning("[Cache] delete %s:%s failed: %s", ns, key, e)
+
+
+def clear(ns=None):
+    try:
+        backend.clear(ns)
+    except Exception as e:
+        log.warning("[Cache] clear %s failed: %s", ns or '*', e)
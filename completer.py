@@ -0,0 +1,159 @@
+"""
+completer.py — Local prefix-completion engine for /api/autocomplete.
+
+Every keystroke used to be a network call to suggestqueries, even when the
+suggestions for the shorter prefix typed a moment earlier were already
+cached — and offline there was nothing at all. Completions now come from
+a sorted phrase list held in memory:
+
+  • suggestions the network already returned (any prefix)
+  • queries people actually searched
+  • titles of videos in the local search index
+
+Short prefixes (up to TOP_PREFIX characters) match thousands of
+phrases, so each keeps its own top-TOP_K list, updated as weights change
+(weights only grow, so that list is exact). Longer prefixes are two
+bisects plus a scan of the matching range, which is short by then. The
+network only enriches the list in the background (see index.py).
+
+The list holds at most MAX_PHRASES phrases. Going past it drops the
+lightest down to EVICT_TO, so the pruning pass is rare.
+"""
+
+import bisect
+import heapq
+import threading
+
+import logs
+
+log = logs.get('completer')
+
+MAX_RESULTS   = 8
+TOP_PREFIX    = 3       # prefixes this short answer from _top instead of a range scan
+TOP_K         = 16      # phrases kept per short prefix
+INSORT_MAX    = 64      # batches up to this size are insorted, bigger ones re-sort once
+MAX_PHRASE    = 80      # longer titles make poor completions
+SEED_TITLES   = 50_000  # index titles loaded at startup
+MAX_PHRASES   = 200_000
+EVICT_TO      = 180_000 # prune this far below the cap once it is hit
+
+WEIGHT_SUGGESTION = 3.0   # per appearance in an upstream suggestion list
+WEIGHT_QUERY      = 5.0   # per real search
+WEIGHT_TITLE      = 1.0
+
+_keys    = []   # sorted, lowercased phrases
+_weights = {}   # key → weight
+_display = {}   # key → phrase as first seen (original casing)
+_top     = {}   # short prefix → up to TOP_K keys, heaviest first
+_lock    = threading.Lock()
+
+
+def _normalize(phrase):
+    return " ".join(phrase.lower().split())
+
+
+def _prepare(phrase):
+    """(display, key) for a phrase, or None if it's too short to be useful."""
+    if not phrase:
+        return None
+    phrase = " ".join(phrase.split())[:MAX_PHRASE]
+    key = phrase.lower()
+    return (phrase, key) if len(key) >= 2 else None
+
+
+def add(phrase, weight=1.0):
+    """Add a phrase (or bump its weight if already known)."""
+    add_many([phrase], weight)
+
+
+def _bump_top(key):
+    """Re-rank key in the top lists of its short prefixes after its weight grew."""
+    rank = _weights.__getitem__
+    for n in range(1, min(len(key), TOP_PREFIX) + 1):
+        top = _top.setdefault(key[:n], [])
+        if key not in top:
+            if len(top) < TOP_K:
+                top.append(key)
+            elif rank(key) > rank(top[-1]):
+                top[-1] = key
+            else:
+                continue
+        top.sort(key=rank, reverse=True)
+
+
+def _evict():
+    """Drop the lightest phrases down to EVICT_TO; rebuild the top lists they were in."""
+    global _keys
+    gone = set(heapq.nsmallest(len(_keys) - EVICT_TO, _keys, key=_weights.__getitem__))
+    for key in gone:
+        del _weights[key], _display[key]
+    _keys = [k for k in _keys if k not in gone]
+    rank = _weights.__getitem__
+    for prefix, top in list(_top.items()):
+        if not any(k in gone for k in top):
+            continue
+        start = bisect.bisect_left(_keys, prefix)
+        end   = bisect.bisect_left(_keys, prefix + "\uffff", start)
+        if start == end:
+            del _top[prefix]
+        else:
+            _top[prefix] = heapq.nlargest(TOP_K, _keys[start:end], key=rank)
+    log.info("[Complete] evicted %s light phrases, %s left", len(gone), len(_keys))
+
+
+def add_many(phrases, weight=1.0):
+    """
+    Add phrases in one pass. A few new keys (one search page) are insorted;
+    a big batch (seeding) is appended and the list re-sorted once, which is
+    far cheaper than one insort per phrase.
+    """
+    fresh, touched = [], []
+    with _lock:
+        for phrase in phrases:
+            item = _prepare(phrase)
+            if not item:
+                continue
+            display, key = item
+            if key in _weights:
+                _weights[key] += weight
+            else:
+                _weights[key] = weight
+                _display[key] = display
+                fresh.append(key)
+            touched.append(key)
+        if len(fresh) <= INSORT_MAX:
+            for key in fresh:
+                bisect.insort(_keys, key)
+        else:
+            _keys.extend(fresh)
+            _keys.sort()
+        for key in touched:
+            _bump_top(key)
+        if len(_keys) > MAX_PHRASES:
+            _evict()
+
+
+def complete(prefix, limit=MAX_RESULTS):
+    """Highest-weighted known phrases starting with prefix."""
+    prefix = _normalize(prefix)
+    if not prefix:
+        return []
+    with _lock:
+        if len(prefix) <= TOP_PREFIX:
+            best = _top.get(prefix, [])[:limit]
+        else:
+            start = bisect.bisect_left(_keys, prefix)
+            end   = bisect.bisect_left(_keys, prefix + "\uffff", start)
+            best  = heapq.nlargest(limit, _keys[start:end], key=_weights.__getitem__)
+        return [_display[k] for k in best]
+
+
+def size():
+    return len(_keys)
+
+
+def seed_from_index(search_index):
+    """Load recently seen video titles from the local index (run off-request)."""
+    titles = search_index.titles(limit=SEED_TITLES)
+    add_many(titles, WEIGHT_TITLE)
+    log.info("[Complete] seeded %s titles, %s phrases", len(titles), size())
@@ -0,0 +1,75 @@
+"""
+compress.py — gzip / brotli for responses.
+
+HTML pages and the JSON feeds (/api/trending, /api/search-more) used to
+go out uncompressed. index.py now passes every response through
+compress.response(), which compresses it when:
+
+  - the body is text (COMPRESSIBLE) and at least MIN_SIZE bytes,
+  - the client's Accept-Encoding allows br or gzip (br preferred, when
+    the optional brotli package is installed),
+  - it isn't streamed, a file (send_file — see assets.py for static
+    files) or already encoded.
+
+Vary: Accept-Encoding is added to anything compressible, compressed or
+not, so shared caches keep the variants apart.
+"""
+
+import gzip
+
+try:
+    import brotli   # optional dependency
+except ImportError:
+    brotli = None
+
+MIN_SIZE = 1024   # below about one packet compression saves nothing
+COMPRESSIBLE = {'text/html', 'text/css', 'text/plain', 'text/javascript',
+                'application/javascript', 'application/json'}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5   # dynamic bodies: close to gzip -9 size at gzip -6 speed
+
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)   # preference order
+
+
+def encode(data, coding, best=False):
+    """data compressed with coding ('br' / 'gzip'); best=True for build-time assets."""
+    if coding == 'br':
+        return brotli.compress(data, quality=11 if best else BROTLI_QUALITY)
+    # mtime=0 keeps the output byte-identical across runs
+    return gzip.compress(data, compresslevel=9 if best else GZIP_LEVEL, mtime=0)
+
+
+def negotiate(accept_encoding, available=ENCODINGS):
+    """The first of available the Accept-Encoding header allows, or None."""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    for coding in available:
+        if accepted.get(coding, accepted.get('*', 0)) > 0:
+            return coding
+    return None
+
+
+def response(resp, accept_encoding):
+    """Compress a Flask response in place if it is worth it (see module doc)."""
+    if resp.mimetype not in COMPRESSIBLE:
+        return resp
+    resp.vary.add('Accept-Encoding')
+    if (resp.direct_passthrough or resp.is_streamed
+            or 'Content-Encoding' in resp.headers
+            or resp.status_code < 200 or resp.status_code in (204, 206, 304)):
+        return resp
+    data = resp.get_data()
+    coding = negotiate(accept_encoding) if len(data) >= MIN_SIZE else None
+    if coding is None:
+        return resp
+    resp.set_data(encode(data, coding))
+    resp.headers['Content-Encoding'] = coding
+    return resp
@@ -0,0 +1,98 @@
+"""
+deadline.py — End-to-end request deadline shared by all three tiers.
+
+Each tier used to carry its own timeout (or none — yt-dlp extraction is
+unbounded), so a slow first tier could eat the whole Vercel execution
+limit before the fallback ever ran. Instead every request gets one
+Deadline; each tier call takes what it needs from it but must leave a
+reserve for the tiers after it:
+
+    deadline.start(9.0)                                     # before_request
+    videos = deadline.run(search_youtube, q, reserve=3.5)   # tier 1
+    invidious._http_get(url)   # clamps its socket timeout to what's left
+
+The active deadline lives in a ContextVar, so helpers deep in the call
+stack (invidious._http_get) read it without it being threaded through
+every signature. Code outside a request sees an unlimited deadline.
+"""
+
+import contextvars
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import executor
+
+# Stages that blow their budget are abandoned, not killed — one that already
+# started finishes in the background, one still queued is cancelled. They run in the executor's bounded 'stage' lane, so a
+# pile-up can't grow without limit; a saturated lane just makes later
+# stages time out into the next tier.
+
+
+class DeadlineExceeded(TimeoutError):
+    """A stage ran out of its share of the request budget."""
+
+
+class Deadline:
+    """Absolute point in time (monotonic) a request must be answered by."""
+
+    def __init__(self, budget=None):
+        self.budget  = budget
+        self.expires = None if budget is None else time.monotonic() + budget
+
+    def remaining(self):
+        """Seconds left; None for an unlimited deadline."""
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def stage_budget(self, reserve=0.0):
+        """Time a stage may use while still leaving `reserve` for later tiers."""
+        left = self.remaining()
+        return None if left is None else max(0.0, left - reserve)
+
+    def clamp(self, timeout, reserve=0.0):
+        """min(timeout, stage budget) — for socket timeouts."""
+        budget = self.stage_budget(reserve)
+        return timeout if budget is None else min(timeout, budget)
+
+
+_current = contextvars.ContextVar("viewtube_deadline", default=Deadline())
+
+
+def start(budget):
+    """Begin a new deadline for the current request."""
+    d = Deadline(budget)
+    _current.set(d)
+    return d
+
+
+def current():
+    return _current.get()
+
+
+def submit(fn, *args, **kwargs):
+    """Start fn in the executor's stage lane with the caller's deadline; returns a Future."""
+    return executor.submit('stage', fn, *args, **kwargs)
+
+
+def run(fn, *args, reserve=0.0, **kwargs):
+    """
+    Call fn(*args, **kwargs), giving up once only `reserve` seconds of the
+    request budget are left. Raises DeadlineExceeded when cut off; the call
+    keeps running in the background (its result is discarded).
+    """
+    budget = current().stage_budget(reserve)
+    if budget is None:
+        return fn(*args, **kwargs)
+    if budget <= 0:
+        raise DeadlineExceeded(f"no budget left for {getattr(fn, '__name__', fn)}")
+    fut = submit(fn, *args, **kwargs)   # worker sees the same deadline
+    try:
+        return fut.result(timeout=budget)
+    except FutureTimeout:
+        fut.cancel()   # drops it if it is still queued in the stage lane
+        raise DeadlineExceeded(
+            f"{getattr(fn, '__name__', fn)} cut off after {budget:.1f}s") from None
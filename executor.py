@@ -0,0 +1,122 @@
+"""
+executor.py — One shared thread pool, with a concurrency lane per upstream.
+
+Background and fan-out work used to run on a mix of pools: a
+ThreadPoolExecutor per Invidious trending call and per netprobe sweep
+(created and torn down every time), a background pool, a prefetch pool
+and the deadline stage pool. None of them knew which upstream the work
+would hit. Now everything goes through here:
+
+    fut = executor.submit('ytdlp', _crawl_channel, channel_id)
+
+Each task names the upstream it talks to. The lane for that upstream
+runs at most LIMITS[...] tasks at once; the rest wait in the lane's FIFO
+queue and don't hold a thread. Lanes:
+
+  stage             deadline.run / hedge tiers (they call upstreams inline)
+  ytdlp             yt-dlp crawls and prefetch (YouTube pages)
+  feeds             YouTube channel RSS feeds
+  invidious:<host>  one lane per mirror, sharing the 'invidious' limit
+  suggest           suggestqueries.google.com
+  probe             netprobe sweeps
+  dns               resolver.py lookups
+  local             CPU-only background work
+
+Tasks run with a copy of the caller's context (request deadline, trace
+spans, admission class), like deadline.submit always did. Running and
+queued counts per lane are exported as viewtube_executor_tasks.
+"""
+
+import collections
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import metrics
+
+# Concurrent tasks per lane ('invidious:<host>' lanes use the 'invidious' entry)
+LIMITS = {
+    'stage':     16,
+    'ytdlp':     6,
+    'feeds':     4,
+    'invidious': 3,
+    'suggest':   2,
+    'probe':     8,
+    'dns':       4,
+    'local':     2,
+}
+# At least the sum of the lane limits in use, so a full lane never starves another
+MAX_THREADS = 64
+
+_pool  = ThreadPoolExecutor(max_workers=MAX_THREADS, thread_name_prefix='viewtube')
+_lanes = {}   # {upstream: _Lane}
+_lock  = threading.Lock()
+
+
+class _Lane:
+    def __init__(self, limit):
+        self.limit   = limit
+        self.running = 0
+        self.queue   = collections.deque()   # (future, context, fn, args, kwargs, queued_at)
+
+
+def _lane(upstream):
+    lane = _lanes.get(upstream)
+    if lane is None:
+        limit = LIMITS.get(upstream.split(':', 1)[0], LIMITS['local'])
+        lane = _lanes[upstream] = _Lane(limit)
+    return lane
+
+
+def submit(upstream, fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) in upstream's lane with the caller's context. Returns a Future."""
+    fut  = Future()
+    task = (fut, contextvars.copy_context(), fn, args, kwargs, time.perf_counter())
+    with _lock:
+        lane = _lane(upstream)
+        if lane.running >= lane.limit:
+            lane.queue.append(task)
+            return fut
+        lane.running += 1
+    _pool.submit(_drain, upstream, task)
+    return fut
+
+
+def _drain(upstream, task):
+    """Run task, then keep taking the lane's queued tasks until it is empty."""
+    while task is not None:
+        fut, ctx, fn, args, kwargs, queued_at = task
+        metrics.executor_wait.observe(time.perf_counter() - queued_at, upstream.split(':', 1)[0])
+        if fut.set_running_or_notify_cancel():   # False: cancelled while queued
+            try:
+                result = ctx.run(fn, *args, **kwargs)
+            except BaseException as e:
+                fut.set_exception(e)
+            else:
+                fut.set_result(result)
+        with _lock:
+            lane = _lanes[upstream]
+            if lane.queue:
+                task = lane.queue.popleft()
+            else:
+                task = None
+                lane.running -= 1
+
+
+def stats():
+    """{upstream: {'limit', 'running', 'queued'}} — also exported to /metrics."""
+    with _lock:
+        return {name: {'limit': lane.limit, 'running': lane.running, 'queued': len(lane.queue)}
+                for name, lane in _lanes.items()}
+
+
+def _collect():
+    values = {}
+    for name, s in stats().items():
+        values[(name, 'running')] = s['running']
+        values[(name, 'queued')]  = s['queued']
+    return values
+
+
+metrics.executor_tasks.collect = _collect
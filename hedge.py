@@ -0,0 +1,91 @@
+"""
+hedge.py — Cross-tier hedged fetching.
+
+The normal fallback chain is strictly sequential: Invidious only starts
+once yt-dlp has failed, often several seconds in. With hedging, yt-dlp
+starts first; if it hasn't produced a valid result after HEDGE_DELAY the
+Invidious fetch starts alongside it. The first valid result wins — except
+that a fast Invidious answer waits up to HEDGE_GRACE for yt-dlp, whose
+data (direct stream URLs, avatars) is preferred.
+
+Opt-in (VIEWTUBE_HEDGE=1): it spends an extra upstream call whenever
+yt-dlp is merely slow, in exchange for a much shorter tail during partial
+YouTube blocking.
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, TimeoutError as FutureTimeout, wait
+
+import deadline
+import logs
+
+log = logs.get('hedge')
+
+HEDGE_ENABLED = os.environ.get('VIEWTUBE_HEDGE', '') not in ('', '0', 'false')
+HEDGE_DELAY   = float(os.environ.get('VIEWTUBE_HEDGE_DELAY', 1.0))   # seconds before Invidious starts
+HEDGE_GRACE   = 0.5    # how long a winning Invidious result waits for yt-dlp
+
+
+def _result(fut):
+    """Future's result, or None if it raised."""
+    try:
+        return fut.result()
+    except Exception as e:
+        log.debug("[Hedge] tier failed: %s", e)
+        return None
+
+
+def race(primary, secondary, delay=HEDGE_DELAY, grace=HEDGE_GRACE, reserve=0.0):
+    """
+    Run primary (yt-dlp), hedging with secondary (Invidious) after `delay`.
+    Both are zero-argument callables; a falsy return counts as a failure.
+    Bounded by the request deadline (minus `reserve`).
+    Returns (winner, result) — winner is 'primary' / 'secondary' / None.
+    """
+    d = deadline.current()
+
+    def budget(cap=None):
+        left = d.stage_budget(reserve)
+        if cap is None:
+            return left
+        return cap if left is None else min(cap, left)
+
+    p = deadline.submit(primary)
+    try:
+        res = p.result(timeout=budget(delay))
+        if res:
+            return 'primary', res
+    except FutureTimeout:
+        pass
+    except Exception as e:
+        log.debug("[Hedge] yt-dlp failed: %s", e)
+
+    log.debug("[Hedge] yt-dlp slow or failed, starting Invidious")
+    s = deadline.submit(secondary)
+    names   = {p: 'primary', s: 'secondary'}
+    pending = {f for f in names if not f.done()} | {s}
+    fallback, grace_until = None, None
+
+    while pending:
+        timeout = budget()
+        if grace_until is not None:
+            timeout = budget(max(0.0, grace_until - time.monotonic()))
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            break   # deadline, or yt-dlp missed the grace window
+        # done is a set — look at yt-dlp first when both landed together
+        for fut in sorted(done, key=lambda f: f is not p):
+            res = _result(fut)
+            if not res:
+                continue
+            if names[fut] == 'primary':
+                return 'primary', res
+            fallback, grace_until = res, time.monotonic() + grace
+            if p not in pending:
+                return 'secondary', res   # yt-dlp already failed — nothing to wait for
+
+    if fallback:
+        log.debug("[Hedge] Invidious won")
+        return 'secondary', fallback
+    return None, None
@@ -1,53 +1,131 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, abort
-import yt_dlp
+from flask import Flask, render_template, make_response, request, redirect, url_for, jsonify, flash, abort, g, Response, send_from_directory, before_render_template, template_rendered
 import re
 import random
 import os
-import socket
 import urllib.request
 import urllib.parse
+import urllib.error
 import xml.etree.ElementTree as ET
+from concurrent.futures import TimeoutError as FutureTimeout
 import mock_data
 import invidious
+import cache
+import netprobe
+import deadline
+import admission
+import assets
+import compress
+import executor
+import quality
+import resolver
+import ytpool
+import hedge
+import scheduler
+import search_index
+import completer
+import snapshots
+import metrics
+import logs
+import tracing
 import time
 import json
+import base64
+import multiprocessing
+import threading
+from collections import Counter, OrderedDict
+
+log = logs.get('index')
 
 # ─────────────────────────────────────────────────────────────────────
-# THREE-TIER DATA SOURCE  (auto-selected per request, cached 60 s)
+# THREE-TIER DATA SOURCE  (auto-selected per request from the latest
+#                          netprobe snapshot, refreshed in the background)
 #
-#  Tier 1 — yt-dlp        : YouTube DNS resolves  OR  VERCEL env set
-#  Tier 2 — Invidious API : YouTube blocked, but Invidious reachable
+#  Tier 1 — yt-dlp        : YouTube answers  OR  VERCEL env set
+#  Tier 2 — Invidious API : YouTube blocked, but an Invidious mirror answers
 #  Tier 3 — Static mock   : Everything offline (last resort only)
 # ─────────────────────────────────────────────────────────────────────
-_net_cache   = {'yt': None, 'inv': None, 'at': 0}
-CACHE_TTL    = 60   # seconds
-
-# ── Suggestion cache: {query: (timestamp, [results])} ──
-_suggest_cache = {}
-SUGGEST_TTL    = 300  # 5 minutes
-
-# ── Trending pool cache ──
-_trending_cache = {'videos': [], 'at': 0}
+PROBE_TARGETS = {
+    'youtube': 'https://www.youtube.com/generate_204',
+    'suggest': 'https://suggestqueries.google.com/complete/search?client=firefox&ds=yt&q=a',
+    **invidious.probe_targets(),
+}
+
+# ── Shared caches (cache.py — SQLite file / Redis, shared by all workers) ──
+#   'suggest'  : query_lower        → [suggestions]
+#   'trending' : 'current'          → snapshot id of the latest pool build
+#                'snapshot:<id>'    → [videos]  (immutable, outlives 'current' by TRENDING_GRACE)
+#   'search'   : query / query|off  → [videos]
+#   'video'    : video_id           → watch-page dict
+#   'avatar'   : channel_id         → url ('' = known to have none)
+SUGGEST_TTL     = 300   # 5 minutes
+SEARCH_TTL      = 600
+VIDEO_TTL       = 1800  # stream URLs expire after a few hours — stay well inside that
+MOCK_TTL        = 2 * netprobe.PROBE_INTERVAL   # offline placeholders must not outlive the outage
+
+# Offline search (search_index.py): serve local BM25 hits as the first
+# results page while upstream loads, not only when the network is down
+LOCAL_FIRST = os.environ.get('VIEWTUBE_LOCAL_FIRST', '') not in ('', '0', 'false')
+
+# ── Search popularity since the last warm-up refresh: {query: hits} ──
+_hot_searches = Counter()
+_hot_lock     = threading.Lock()
+
+# ── Trending pool ──
 TRENDING_TTL    = 600   # 10 minutes — refresh once per session roughly
 TRENDING_POOL   = 36    # fetch this many up-front; JS pages through in chunks of 12
 TRENDING_PAGE   = 12    # videos per infinite-scroll page
+TRENDING_GRACE  = 900   # a replaced snapshot stays readable this long, so open scrolls finish on it
+
+# ── Channel RSS: cache 'rss' {channel_id: {'videos', 'info', 'etag', 'modified', 'at'}} ──
+RSS_TTL    = 300    # serve without revalidating for 5 minutes, then If-None-Match
+RSS_KEEP   = 3600   # keep the validators (and a stale feed to fall back on) this long
+RSS_TIMEOUT = 5
+
+# ── Full channel crawl: cache 'channel' {channel_id: {'videos', 'info'}} ──
+_channel_inflight = {}   # {channel_id: Future} — one yt-dlp crawl per channel at a time
+_channel_lock     = threading.Lock()
+CHANNEL_TTL       = 600
+CHANNEL_MERGE_WAIT = 1.5  # seconds to wait for yt-dlp once the RSS page is ready
+CHANNEL_WINDOW    = 15    # videos per window — first render and each scroll step
+
+# ── Channel windows: cache 'channel_window' {'<channel_id>|<offset>': videos} ──
+# ── Invidious channel pages: cache 'inv_channel' {channel_id: {'videos', 'continuation', 'done', 'at'}} ──
+
+# ── Playlist windows: cache 'playlist_window' {'<playlist_id>|<offset>': {'videos', 'info'}} ──
+# ── Invidious playlist pages: cache 'inv_playlist' {playlist_id: {'videos', 'info', 'page', 'done', 'at'}} ──
+PLAYLIST_TTL    = 600
+PLAYLIST_WINDOW = 25    # videos per window — first render and each scroll step
+
+# ── Request deadline (deadline.py) ──
+# Every request must finish inside REQUEST_BUDGET (Vercel's limit is 10 s).
+# yt-dlp may use all of it except TIER_RESERVE, which is kept back so the
+# Invidious tier (and the instant mock tier) always get a real chance.
+REQUEST_BUDGET = float(os.environ.get('VIEWTUBE_REQUEST_BUDGET', 9.0))
+TIER_RESERVE   = 3.5
+
+# ── Search prefetch: page N+1 is fetched while the user reads page N ──
+PREFETCH_DEPTH    = int(os.environ.get('VIEWTUBE_PREFETCH_DEPTH', 3))  # pages past the first; 0 = off
+PREFETCH_MAX      = 4     # prefetches queued or running at once (they share the 'ytdlp' lane)
+PREFETCH_MAX_LOAD = 8     # skip prefetching while more requests than this are in flight
+_prefetch_inflight = set()   # {(query, offset)}
+_active_requests   = 0
+_load_lock         = threading.Lock()
+
+# ytpool's spawn/forkserver workers re-import the main module (as __mp_main__)
+# before they learn their parent — but after taking their own process name.
+# Background threads, pools and files are only started in the server itself.
+SERVER_PROCESS = multiprocessing.current_process().name == 'MainProcess'
+
+# Vercel freezes the process between invocations and always uses yt-dlp,
+# so the prober only runs on long-lived servers
+if SERVER_PROCESS and not os.environ.get('VERCEL'):
+    netprobe.start(PROBE_TARGETS)
 
 def check_network():
-    """Cached DNS check — returns True if YouTube is directly reachable."""
-    global _net_cache
-    now = time.time()
-    if now - _net_cache['at'] < CACHE_TTL and _net_cache['yt'] is not None:
-        return _net_cache['yt']
-    try:
-        socket.setdefaulttimeout(4)
-        socket.getaddrinfo('www.youtube.com', 443)
-        result = True
-    except OSError:
-        result = False
-    _net_cache['yt'] = result
-    _net_cache['at'] = now
-    return result
+    """Returns True if YouTube is directly reachable, per the latest probe snapshot."""
+    return netprobe.is_up('youtube')
 
+@tracing.traced('source')
 def get_data_source():
     """
     Returns the backend to use for this request:
@@ -61,21 +139,15 @@ def get_data_source():
 
     # Check YouTube directly
     if check_network():
-        print("[ViewTube] Source: yt-dlp (YouTube reachable)")
+        log.debug("[ViewTube] Source: yt-dlp (YouTube reachable)")
         return 'ytdlp'
 
-    # Check Invidious (cache result too)
-    global _net_cache
-    now = time.time()
-    if _net_cache['inv'] is None or now - _net_cache['at'] >= CACHE_TTL:
-        _net_cache['inv'] = invidious.is_available()
-        _net_cache['at']  = now
-
-    if _net_cache['inv']:
-        print("[ViewTube] Source: Invidious proxy (YouTube blocked)")
+    # Check Invidious
+    if invidious.is_available():
+        log.debug("[ViewTube] Source: Invidious proxy (YouTube blocked)")
         return 'invidious'
 
-    print("[ViewTube] Source: static mock (all networks blocked)")
+    log.debug("[ViewTube] Source: static mock (all networks blocked)")
     return 'mock'
 
 # Keep backward compat for any remaining call sites
@@ -85,6 +157,77 @@ def should_use_mock():
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-viewtube-secret-key')
 
+# Hashed, precompressed static files (assets.py); url_for('static', ...) links them
+if SERVER_PROCESS:
+    assets.load(app.static_folder)
+
+@app.url_defaults
+def hashed_static_url(endpoint, values):
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = assets.url(values['filename'])
+
+def serve_static(filename):
+    asset = assets.lookup(filename)
+    if asset is None:
+        return app.send_static_file(filename)
+    coding = compress.negotiate(request.headers.get('Accept-Encoding'), asset['encodings'])
+    response = send_from_directory(app.static_folder, filename + assets.SUFFIX.get(coding, ''),
+                                   mimetype=asset['mimetype'], max_age=assets.MAX_AGE)
+    if coding:
+        response.headers['Content-Encoding'] = coding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.immutable = True   # the name changes with the contents
+    return response
+
+app.view_functions['static'] = serve_static
+
+@app.before_request
+def start_deadline():
+    deadline.start(REQUEST_BUDGET)
+    tracing.start()
+    g.request_start = time.perf_counter()
+
+# Registered first so it runs last, on the finished body
+@app.after_request
+def compress_response(response):
+    return compress.response(response, request.headers.get('Accept-Encoding'))
+
+@app.after_request
+def request_client_hints(response):
+    # Ask for the connection hints quality.py picks a stream from
+    if response.mimetype == 'text/html':
+        response.headers['Accept-CH'] = ', '.join(quality.HINT_HEADERS)
+    return response
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.get('request_start')
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        # Label by URL rule, not path — /channel/<id> must stay one series
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.request_duration.observe(elapsed, route, response.status_code)
+        response.headers['Server-Timing'] = tracing.server_timing(elapsed * 1000)
+        tracing.log(request.method, request.full_path.rstrip('?'), response.status_code, elapsed * 1000)
+    return response
+
+# Template rendering shows up as a 'render' span
+def _render_started(sender, template, context, **extra):
+    g.render_start = time.perf_counter()
+
+def _render_finished(sender, template, context, **extra):
+    start = g.pop('render_start', None)
+    if start is not None:
+        tracing.add('render', (time.perf_counter() - start) * 1000, template.name)
+
+before_render_template.connect(_render_started, app)
+template_rendered.connect(_render_finished, app)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint — see metrics.py for the metric families."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.errorhandler(404)
 def page_not_found(e):
     return render_template('404.html'), 404
@@ -93,17 +236,25 @@ def page_not_found(e):
 def internal_server_error(e):
     return render_template('500.html'), 500
 
+@app.errorhandler(admission.Overloaded)
+def overloaded(e):
+    """A shed extraction with nothing cheaper to fall back to — ask the client to retry."""
+    log.info("[Admission] %s %s: %s", request.method, request.path, e)
+    return render_template('500.html'), 503, {'Retry-After': '1'}
+
+@metrics.timed('ytdlp', 'search')
 def search_youtube(query, max_results=10):
     """
     Search YouTube using yt-dlp
     Returns a list of video dictionaries with metadata
     Limited to max_results to avoid Vercel timeout
     """
-    print(f"Searching for: {query}")  # Debug log
+    log.debug("[yt-dlp] Searching for: %s", query)
     try:
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
+            'logger': logs.YTDLP_LOGGER,
             'extract_flat': 'in_playlist',  # Fast extraction
             'force_generic_extractor': False,
             'noprogress': True,
@@ -114,16 +265,17 @@ def search_youtube(query, max_results=10):
         # IMPORTANT: Use ytsearch prefix for YouTube search
         search_query = f"ytsearch{max_results}:{query}"
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            print(f"Extracting info for query: {search_query}")  # Debug
-            result = ydl.extract_info(search_query, download=False)
+        with ytpool.YoutubeDL(ydl_opts) as ydl:
+            log.debug("[yt-dlp] Extracting info for query: %s", search_query)
+            with admission.slot('search'), tracing.span('ytdlp', 'search'):
+                result = ydl.extract_info(search_query, download=False)
             
             if not result:
-                print("No result returned from yt-dlp")
+                log.warning("[yt-dlp] No result returned")
                 return []
             
             if 'entries' not in result:
-                print(f"No entries in result. Keys: {result.keys()}")
+                log.warning("[yt-dlp] No entries in result. Keys: %s", result.keys())
                 return []
             
             videos = []
@@ -159,30 +311,32 @@ def search_youtube(query, max_results=10):
                             'url':         f"https://www.youtube.com/watch?v={entry.get('id', '')}"
                         }
                     videos.append(item)
-                    print(f"Added {item['type']}: {item['title']}")
+                    log.debug("[yt-dlp] Added %s: %s", item['type'], item['title'])
             
             return videos
     
+    except admission.Overloaded:
+        raise   # shed — the caller takes the next tier
     except Exception as e:
-        print(f"Error searching YouTube: {e}")
-        import traceback
-        traceback.print_exc()
+        log.warning("[yt-dlp] Error searching YouTube: %s", e, exc_info=True)
         raise e  # Propagate error so caller can handle it or show 500
 
 
+@metrics.timed('ytdlp', 'search_more')
 def search_youtube_with_offset(query, offset=0, max_results=10):
     """
     Search YouTube with pagination support
     Fetches results starting from offset
     """
-    print(f"Searching with offset {offset} for: {query}")
+    log.debug("[yt-dlp] Searching with offset %s for: %s", offset, query)
     try:
         # Calculate how many total results we need
         total_needed = offset + max_results
         
         ydl_opts = {
-            'quiet': False,
-            'no_warnings': False,
+            'quiet': True,
+            'no_warnings': True,
+            'logger': logs.YTDLP_LOGGER,
             'extract_flat': True,
             'format': 'best',
             'ignoreerrors': True,
@@ -191,9 +345,10 @@ def search_youtube_with_offset(query, offset=0, max_results=10):
         # Fetch more results than needed to account for offset
         search_query = f"ytsearch{total_needed}:{query}"
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            print(f"Extracting info for query: {search_query}")
-            result = ydl.extract_info(search_query, download=False)
+        with ytpool.YoutubeDL(ydl_opts) as ydl:
+            log.debug("[yt-dlp] Extracting info for query: %s", search_query)
+            with admission.slot('search'), tracing.span('ytdlp', 'search'):
+                result = ydl.extract_info(search_query, download=False)
             
             if not result or 'entries' not in result:
                 return []
@@ -234,44 +389,126 @@ def search_youtube_with_offset(query, offset=0, max_results=10):
             
             # Return only the slice we need (from offset to offset+max_results)
             paginated_videos = videos[offset:offset + max_results]
-            print(f"Returning {len(paginated_videos)} videos from offset {offset}")
+            log.debug("[yt-dlp] Returning %s videos from offset %s", len(paginated_videos), offset)
             return paginated_videos
     
+    except admission.Overloaded:
+        raise   # shed — the caller takes the next tier
     except Exception as e:
-        print(f"Error searching YouTube with offset: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
+        log.warning("[yt-dlp] Error searching YouTube with offset: %s", e, exc_info=True)
+        raise   # search_more falls through to Invidious; nothing gets cached
 
+@metrics.timed('ytdlp', 'channel')
 def get_channel_videos(channel_id):
     """
-    Get videos from a specific channel
+    RSS-first channel fetch. Returns tuple (videos, channel_info).
+
+    The RSS feed (~15 latest uploads, with dates) and the yt-dlp crawl of
+    the first window are started concurrently. We answer as soon as the feed is parsed,
+    giving yt-dlp a short grace period (CHANNEL_MERGE_WAIT) to finish so
+    its richer data can be merged in. A crawl that takes longer keeps
+    running in the background and lands in the 'channel' cache for the next view.
+    """
+    cached = cache.get('channel', channel_id)
+    if cached:
+        return cached['videos'], cached['info']
+
+    with _channel_lock:
+        crawl = _channel_inflight.get(channel_id)
+        started = crawl is None
+        if started:
+            crawl = _channel_inflight[channel_id] = executor.submit('ytdlp', _crawl_channel, channel_id)
+    if started:   # outside the lock: the callback takes it, and may run right here
+        crawl.add_done_callback(lambda fut: _store_channel_crawl(channel_id, fut))
+
+    # RSS only exists for UC… ids — handles have to wait for the crawl
+    rss_videos, rss_info = [], {}
+    if channel_id.startswith('UC'):
+        feed = executor.submit('feeds', fetch_channel_rss, channel_id)
+        try:
+            rss_videos, rss_info = feed.result(timeout=deadline.current().clamp(RSS_TIMEOUT))
+        except FutureTimeout:
+            feed.cancel()   # queued behind other feeds — the crawl is all we'll get
+            log.debug("[Channel] RSS for %s not ready in time", channel_id)
+
+    # Handles have nothing else to show, but still can't wait past the deadline
+    wait = deadline.current().clamp(CHANNEL_MERGE_WAIT) if rss_videos else deadline.current().remaining()
+    try:
+        videos, channel_info = crawl.result(timeout=wait)
+    except FutureTimeout:
+        log.debug("[Channel] Serving %s RSS videos, yt-dlp still crawling", len(rss_videos))
+        return rss_videos, rss_info
+    except Exception as e:
+        log.warning("[Channel] Error fetching channel videos: %s", e)
+        return rss_videos, rss_info
+
+    if not videos:
+        return rss_videos, {**rss_info, **{k: v for k, v in channel_info.items() if v}}
+    return (_merge_channel_videos(videos, rss_videos),
+            {**rss_info, **{k: v for k, v in channel_info.items() if v}})
+
+
+def _merge_channel_videos(crawled, rss_videos):
+    """yt-dlp list is authoritative (durations, older uploads); RSS fills in upload dates."""
+    dates = {v['id']: v['upload_date'] for v in rss_videos}
+    for video in crawled:
+        if video['id'] in dates and video.get('upload_date') in (None, '', 'Unknown date'):
+            video['upload_date'] = dates[video['id']]
+    return crawled
+
+
+def _store_channel_crawl(channel_id, fut):
+    """Done-callback for background crawls — cache the merged result."""
+    with _channel_lock:
+        _channel_inflight.pop(channel_id, None)
+    try:
+        videos, channel_info = fut.result()
+    except Exception as e:
+        log.warning("[Channel] Background crawl failed for %s: %s", channel_id, e)
+        return
+    if not videos:
+        return
+    rss = cache.get('rss', channel_id)
+    if rss:
+        videos = _merge_channel_videos(videos, rss['videos'])
+        channel_info = {**rss['info'], **{k: v for k, v in channel_info.items() if v}}
+    cache.set('channel', channel_id, {'videos': videos, 'info': channel_info}, CHANNEL_TTL)
+
+
+def _crawl_channel(channel_id, start=0, count=CHANNEL_WINDOW):
+    """
+    yt-dlp crawl of one window of a channel's uploads tab,
+    entries [start, start + count).
     Returns tuple (videos, channel_info)
     """
-    print(f"Fetching videos for channel: {channel_id}")
+    log.debug("[Channel] Fetching videos for channel: %s [%s:%s]", channel_id, start, start + count)
     try:
         ydl_opts = {
-            'quiet': False,
-            'no_warnings': False,
+            'quiet': True,
+            'no_warnings': True,
+            'logger': logs.YTDLP_LOGGER,
             'extract_flat': True,
             'format': 'best',
             'ignoreerrors': True,
-            'playlistend': 30, # Limit to 30 latest videos
+            'playliststart': start + 1,   # 1-based, inclusive
+            'playlistend': start + count,
         }
         
-        # Use channel URL format
+        # Use channel URL format — the /videos tab is a single linear list,
+        # so playliststart/playlistend window it consistently
         if channel_id.startswith('UC'):
-            url = f"https://www.youtube.com/channel/{channel_id}"
+            url = f"https://www.youtube.com/channel/{channel_id}/videos"
         elif channel_id.startswith('@'):
-             url = f"https://www.youtube.com/{channel_id}"
+             url = f"https://www.youtube.com/{channel_id}/videos"
         else:
             # Fallback try user or channel
-            url = f"https://www.youtube.com/channel/{channel_id}"
+            url = f"https://www.youtube.com/channel/{channel_id}/videos"
             
-        print(f"Channel URL: {url}")
+        log.debug("[Channel] URL: %s", url)
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            result = ydl.extract_info(url, download=False)
+        with ytpool.YoutubeDL(ydl_opts) as ydl:
+            with admission.slot('channel'), tracing.span('ytdlp', 'channel'):
+                result = ydl.extract_info(url, download=False)
             
             if not result:
                 return [], {}
@@ -310,7 +547,7 @@ def get_channel_videos(channel_id):
                     'thumbnail': entry.get('thumbnail', entry.get('thumbnails', [{}])[0].get('url', '')),
                     'channel': entry.get('uploader', entry.get('channel', 'Unknown')),
                     'channel_id': channel_id,
-                    'duration': format_duration(entry.get('duration', 0)),
+                    'duration': invidious.fmt_dur(entry.get('duration', 0)),
                     'view_count': format_views(entry.get('view_count', 0)),
                     'upload_date': format_date(entry.get('upload_date', '')), # Add date if available
                     'url': f"https://www.youtube.com/watch?v={entry.get('id', '')}"
@@ -322,7 +559,7 @@ def get_channel_videos(channel_id):
                     entry_type = entry.get('_type')
                     # If it's a playlist (e.g. "Videos" tab, "Live" tab), iterate through its contents
                     if entry_type == 'playlist':
-                        print(f"Processing playlist: {entry.get('title')}")
+                        log.debug("[Channel] Processing playlist: %s", entry.get('title'))
                         playlist_entries = entry.get('entries', [])
                         # Handle if entries is a generator or list
                         for sub_entry in playlist_entries:
@@ -343,28 +580,13 @@ def get_channel_videos(channel_id):
                     unique_videos.append(v)
                     seen_ids.add(v['id'])
             
-            print(f"Found {len(unique_videos)} unique videos")
-            
-            # Try to fetch dates from RSS feed if we have a valid channel ID
-            # Use the channel_id from the first video if available, as it's likely the UC ID
-            if unique_videos:
-                target_channel_id = unique_videos[0].get('channel_id')
-                if not target_channel_id or not target_channel_id.startswith('UC'):
-                    target_channel_id = channel_id
-                
-                if target_channel_id and target_channel_id.startswith('UC'):
-                    print(f"Fetching RSS dates for {target_channel_id}...")
-                    rss_dates = fetch_channel_dates_rss(target_channel_id)
-                    if rss_dates:
-                        print(f"Found {len(rss_dates)} dates from RSS")
-                        for video in unique_videos:
-                            if video['id'] in rss_dates:
-                                video['upload_date'] = format_date(rss_dates[video['id']])
-            
+            log.debug("[Channel] Found %s unique videos", len(unique_videos))
             return unique_videos, channel_info
             
+    except admission.Overloaded:
+        raise   # shed — the caller takes the next tier
     except Exception as e:
-        print(f"Error fetching channel videos: {e}")
+        log.warning("[Channel] Error fetching channel videos: %s", e)
         return [], {}
 
 def get_channel_avatar(channel_id):
@@ -383,13 +605,15 @@ def get_channel_avatar(channel_id):
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
+            'logger': logs.YTDLP_LOGGER,
             'extract_flat': True,
             'playlist_items': '0', # Don't fetch any videos, just metadata
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            print(f"Fetching avatar info from: {url}")
-            info = ydl.extract_info(url, download=False)
+        with ytpool.YoutubeDL(ydl_opts) as ydl:
+            log.debug("[Avatar] Fetching avatar info from: %s", url)
+            with admission.slot('avatar'), tracing.span('ytdlp', 'avatar'):
+                info = ydl.extract_info(url, download=False)
             
             # Try to find channel avatar in thumbnails
             thumbnails = info.get('thumbnails', [])
@@ -398,47 +622,166 @@ def get_channel_avatar(channel_id):
                 
             return info.get('thumbnail')
             
+    except admission.Overloaded:
+        raise
     except Exception as e:
-        print(f"Error fetching channel avatar: {e}")
+        log.warning("[Avatar] Error fetching channel avatar: %s", e)
         return None
 
-def fetch_channel_dates_rss(channel_id):
+@metrics.timed('ytdlp', 'channel_more')
+def get_channel_window(channel_id, offset, count=CHANNEL_WINDOW):
     """
-    Fetch upload dates from YouTube RSS feed
-    Returns dict {video_id: iso_date_string}
+    One window of a channel's uploads via yt-dlp.
+    Each window is cached on its own, so only the window being scrolled
+    into costs an extraction.
     """
+    key = f"{channel_id}|{offset}"
+    cached = cache.get('channel_window', key)
+    if cached is not None:
+        return cached
+
+    videos, _ = _crawl_channel(channel_id, start=offset, count=count)
+    rss = cache.get('rss', channel_id)
+    if rss:
+        videos = _merge_channel_videos(videos, rss['videos'])
+    if videos:
+        cache.set('channel_window', key, videos, CHANNEL_TTL)
+    return videos
+
+
+def get_channel_window_invidious(channel_id, offset, count=CHANNEL_WINDOW):
+    """
+    One window of a channel's uploads via Invidious.
+    Invidious pages with opaque continuation tokens rather than offsets, so
+    pages are accumulated per channel and windows are sliced from that list,
+    following continuations only until the requested window is covered.
+    """
+    now = time.time()
+    cached = cache.get('inv_channel', channel_id)
+    # Extend a copy — concurrent scrolls just race to store theirs
+    state = ({**cached, 'videos': list(cached['videos'])} if cached
+             else {'videos': [], 'continuation': None, 'done': False, 'at': now})
+
+    fetched = False
+    while len(state['videos']) < offset + count and not state['done']:
+        videos, token = invidious.get_channel_videos_page(channel_id, state['continuation'])
+        if videos is None:
+            break   # every instance failed — serve what we already have
+        seen = {v['id'] for v in state['videos']}
+        state['videos'].extend(v for v in videos if v['id'] not in seen)
+        state['continuation'] = token
+        state['done'] = not token or not videos
+        fetched = True
+
+    # The page list expires CHANNEL_TTL after its first page, however far it grows
+    if fetched:
+        cache.set('inv_channel', channel_id, state, max(1, CHANNEL_TTL - (now - state['at'])))
+    return state['videos'][offset:offset + count]
+
+
+# Namespaces used by YouTube's channel Atom feed
+RSS_NS = {
+    'atom':  'http://www.w3.org/2005/Atom',
+    'yt':    'http://www.youtube.com/xml/schemas/2015',
+    'media': 'http://search.yahoo.com/mrss/',
+}
+
+@tracing.traced('rss')
+def fetch_channel_rss(channel_id):
+    """
+    Fetch the channel's RSS feed (~15 latest uploads) as video cards.
+    Returns tuple (videos, channel_info).
+
+    Cached per channel for RSS_TTL; after that the feed is revalidated with
+    If-None-Match / If-Modified-Since so an unchanged feed costs a 304.
+    """
+    now = time.time()
+    cached = cache.get('rss', channel_id)
+    if cached and now - cached['at'] < RSS_TTL:
+        return cached['videos'], cached['info']
+
+    url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached and cached.get('modified'):
+        headers['If-Modified-Since'] = cached['modified']
+    req = urllib.request.Request(url, headers=headers)
+
     try:
-        url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        
-        with urllib.request.urlopen(req, timeout=5) as response:
+        with resolver.urlopen(req, timeout=deadline.current().clamp(RSS_TIMEOUT)) as response:
             xml_data = response.read()
-            root = ET.fromstring(xml_data)
-            
-            # Namespace map usually needed for findall with default ns
-            ns = {'atom': 'http://www.w3.org/2005/Atom', 'yt': 'http://www.youtube.com/xml/schemas/2015'}
-            
-            dates = {}
-            # Find all entries using namespace
-            for entry in root.findall('atom:entry', ns):
-                video_id_elem = entry.find('yt:videoId', ns)
-                published_elem = entry.find('atom:published', ns)
-                
-                if video_id_elem is not None and published_elem is not None:
-                    dates[video_id_elem.text] = published_elem.text
-                    
-            return dates
+            etag     = response.headers.get('ETag')
+            modified = response.headers.get('Last-Modified')
+        videos, info = _parse_channel_rss(xml_data, channel_id)
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached:
+            cached['at'] = now
+            cache.set('rss', channel_id, cached, RSS_KEEP)
+            return cached['videos'], cached['info']
+        log.warning("[RSS] Error fetching RSS feed: %s", e)
+        return (cached['videos'], cached['info']) if cached else ([], {})
     except Exception as e:
-        print(f"Error fetching RSS dates: {e}")
-        return {}
+        log.warning("[RSS] Error fetching RSS feed: %s", e)
+        # A stale feed beats an empty page
+        return (cached['videos'], cached['info']) if cached else ([], {})
+
+    cache.set('rss', channel_id, {
+        'videos':   videos,
+        'info':     info,
+        'etag':     etag,
+        'modified': modified,
+        'at':       now,
+    }, RSS_KEEP)
+    return videos, info
+
+
+def _parse_channel_rss(xml_data, channel_id):
+    """Parse a channel Atom feed into (videos, channel_info)."""
+    root = ET.fromstring(xml_data)
+    channel_name = (root.findtext('atom:author/atom:name', '', RSS_NS)
+                    or root.findtext('atom:title', '', RSS_NS))
+
+    videos = []
+    for entry in root.findall('atom:entry', RSS_NS):
+        vid_id = entry.findtext('yt:videoId', '', RSS_NS)
+        if not vid_id:
+            continue
+        thumb = entry.find('media:group/media:thumbnail', RSS_NS)
+        stats = entry.find('media:group/media:community/media:statistics', RSS_NS)
+        published = entry.findtext('atom:published', '', RSS_NS)
+        videos.append({
+            'id':          vid_id,
+            'title':       entry.findtext('atom:title', 'Untitled', RSS_NS),
+            'thumbnail':   thumb.get('url') if thumb is not None else f"https://i.ytimg.com/vi/{vid_id}/hqdefault.jpg",
+            'channel':     channel_name or 'Unknown',
+            'channel_id':  channel_id,
+            'duration':    '',   # not in the feed — filled in by the yt-dlp merge
+            'view_count':  format_views(int(stats.get('views', 0) or 0)) if stats is not None else '',
+            'upload_date': format_date(published),
+            'published':   published,
+            'url':         f"https://www.youtube.com/watch?v={vid_id}",
+        })
+
+    return videos, {'title': channel_name}
+
+
+def fetch_channel_dates_rss(channel_id):
+    """
+    Fetch upload dates from YouTube RSS feed
+    Returns dict {video_id: iso_date_string}
+    """
+    videos, _ = fetch_channel_rss(channel_id)
+    return {v['id']: v['published'] for v in videos}
 
+@metrics.timed('ytdlp', 'trending')
 def get_trending_videos(max_results=15):
     """
     Fetch niche developer / coding content instead of generic regional trending.
     Picks 3 random topics, fetches a few results from each, then merges & shuffles
     so every home page load feels fresh.
     """
-    print("Fetching niche trending videos...")
+    log.debug("[Trending] Fetching niche trending videos...")
 
     # Re-use the single source of truth defined in invidious.py
     selected = random.sample(invidious.NICHE_TOPICS, k=3)
@@ -448,7 +791,15 @@ def get_trending_videos(max_results=15):
     seen_ids   = set()
 
     for topic in selected:
-        print(f"  → Fetching: '{topic}'")
+        # Topics pre-searched by the warm-up job are already in the cache
+        results = cache.get('search', topic)
+        if results:
+            for v in results[:per_topic]:
+                if v.get('id') not in seen_ids:
+                    seen_ids.add(v['id'])
+                    all_videos.append(v)
+            continue
+        log.debug("[Trending] Fetching: '%s'", topic)
         try:
             results = search_youtube(topic, max_results=per_topic)
             for v in (results or []):
@@ -456,106 +807,215 @@ def get_trending_videos(max_results=15):
                     seen_ids.add(v['id'])
                     all_videos.append(v)
         except Exception as e:
-            print(f"  → Error for '{topic}': {e}")
+            log.warning("[Trending] Error for '%s': %s", topic, e)
 
     random.shuffle(all_videos)
     return all_videos[:max_results]
 
+def build_trending_pool():
+    """
+    Fetch TRENDING_POOL videos via the 3-tier fallback and publish them as
+    a new trending snapshot. Called on a cold /api/trending and by the
+    warm-up job. Returns (snapshot id, videos).
+    """
+    source = get_data_source()
+    videos = None
+
+    if source == 'ytdlp':
+        try:
+            videos = deadline.run(get_trending_videos, max_results=TRENDING_POOL,
+                                  reserve=TIER_RESERVE)
+        except Exception as e:
+            log.warning("[yt-dlp] trending error: %s", e)
+        if not videos:
+            metrics.fallback('trending', 'ytdlp', 'invidious')
+            source = 'invidious'
+
+    if source == 'invidious':
+        videos = invidious.get_trending(max_results=TRENDING_POOL)
+        if not videos:
+            metrics.fallback('trending', 'invidious', 'mock')
+            source = 'mock'
+
+    if source == 'mock' or not videos:
+        source = 'mock'
+        videos = snapshots.get('trending', 'pool') or mock_data.get_mock_trending()
+
+    version = _publish_trending(videos, MOCK_TTL if source == 'mock' else TRENDING_TTL)
+    if source != 'mock':
+        snapshots.record('trending', 'pool', videos)
+        search_index.record(videos)
+    log.info("[Trending] Snapshot %s published: %s videos", version, len(videos))
+    return version, videos
+
+
+def _publish_trending(videos, ttl):
+    """
+    Store a pool build as an immutable snapshot and make it current.
+    Snapshots are never rewritten — a rebuild publishes a new id, and the
+    old one stays readable for TRENDING_GRACE after it stops being current.
+    """
+    version = f"{int(time.time()):x}{random.getrandbits(16):04x}"
+    cache.set('trending', f'snapshot:{version}', videos, ttl + TRENDING_GRACE)
+    cache.set('trending', 'current', version, ttl)
+    return version
+
+
+def _current_trending():
+    """(snapshot id, videos) of the current pool, building one if there is none."""
+    version = cache.get('trending', 'current')
+    videos = cache.get('trending', f'snapshot:{version}') if version else None
+    if videos:
+        return version, videos
+    return build_trending_pool()
+
+
+def _trending_cursor(version, offset):
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode()).decode().rstrip('=')
+
+
+def _parse_trending_cursor(cursor):
+    """(snapshot id, offset), or (None, 0) for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        version, offset = raw.rsplit(':', 1)
+        return version, max(0, int(offset))
+    except ValueError:
+        return None, 0
+
 @app.route('/api/trending')
 def trending():
     """
     API endpoint for trending/home-page videos.
-    Supports ?offset=N for infinite scroll.
-
-    Server-side pool cache:
-      • On first call (offset=0 or cache stale) fetches TRENDING_POOL videos
-        via the 3-tier fallback and stores them for TRENDING_TTL seconds.
-      • Subsequent calls slice the cached pool — zero extra API calls.
-      • Returns [] when offset ≥ pool size (signals end-of-feed to JS).
+    Returns {'videos': [...], 'next': cursor | None, 'snapshot': id}.
+
+    Server-side pool snapshots:
+      • The first page (no cursor) comes from the current snapshot,
+        building one via the 3-tier fallback if there is none.
+      • ?cursor= pages slice the snapshot the scroll started on, even
+        after a rebuild — no duplicates or gaps, zero extra API calls.
+      • next is None at the end of the feed.
+      • A cursor whose snapshot this instance doesn't hold (past its
+        grace period, or built by another worker with a local cache)
+        continues in the current snapshot at the same offset.
+      • ?offset=N (old clients) slices the current snapshot.
     """
-    global _trending_cache
-    offset = int(request.args.get('offset', 0))
-    now    = time.time()
-
-    # Refresh the pool if stale or empty
-    if not _trending_cache['videos'] or now - _trending_cache['at'] >= TRENDING_TTL:
-        source = get_data_source()
-        videos = None
-
-        if source == 'ytdlp':
-            try:
-                videos = get_trending_videos(max_results=TRENDING_POOL)
-            except Exception as e:
-                print(f"[yt-dlp] trending error: {e}")
-            if not videos:
-                source = 'invidious'
-
-        if source == 'invidious':
-            videos = invidious.get_trending(max_results=TRENDING_POOL)
-            if not videos:
-                source = 'mock'
-
-        if source == 'mock' or not videos:
-            videos = mock_data.get_mock_trending()
-
-        _trending_cache['videos'] = videos
-        _trending_cache['at']     = now
-        print(f"[Trending] Cache refreshed: {len(videos)} videos")
-
-    pool = _trending_cache['videos']
+    cursor = request.args.get('cursor')
+    pinned = False
+    if cursor:
+        version, offset = _parse_trending_cursor(cursor)
+        pool = cache.get('trending', f'snapshot:{version}') if version else None
+        pinned = pool is not None
+        if not pinned:
+            log.debug("[Trending] Snapshot %s not here, continuing in the current one", version)
+            version, pool = _current_trending()
+    else:
+        offset = int(request.args.get('offset', 0))
+        version, pool = _current_trending()
+
     page = pool[offset : offset + TRENDING_PAGE]
-    return jsonify(page)
+    end  = offset + len(page)
+    response = jsonify({
+        'videos':   page,
+        'next':     _trending_cursor(version, end) if page and end < len(pool) else None,
+        'snapshot': version,
+    })
+    if pinned:
+        # A cursor always names the same slice of an immutable snapshot
+        response.cache_control.private = True
+        response.cache_control.max_age = TRENDING_TTL + TRENDING_GRACE
+        response.cache_control.immutable = True
+    return response
 
 
 @app.route('/api/autocomplete')
 def autocomplete():
     """
-    API endpoint for search autocomplete — uses Google's YouTube suggestion
-    API (same source as the real YouTube search bar, near-instant).
+    API endpoint for search autocomplete — answered locally by completer.py
+    (cached suggestions, past queries, indexed titles) in well under 1 ms.
+    Google's YouTube suggestion API only enriches it in the background.
     """
     query = request.args.get('q', '').strip()
 
     if not query or len(query) < 2:
         return jsonify([])
 
-    suggestions = get_search_suggestions(query)
-    return jsonify(suggestions)
+    _enrich_suggestions(query)
+    return jsonify(completer.complete(query))
+
+
+# Suggestion lists already merged into the completer (most recent last) / being fetched
+SUGGEST_MERGED_MAX   = 10_000
+SUGGEST_INFLIGHT_MAX = 8      # fetches queued or running at once (they share the 'suggest' lane)
+_suggest_merged   = OrderedDict()   # {query_lower: None}
+_suggest_inflight = set()
+_suggest_lock     = threading.Lock()
+
+def _mark_suggest_merged(query_lower):
+    with _suggest_lock:
+        _suggest_merged[query_lower] = None
+        _suggest_merged.move_to_end(query_lower)
+        while len(_suggest_merged) > SUGGEST_MERGED_MAX:
+            _suggest_merged.popitem(last=False)
+
+def _suggest_done(query_lower):
+    with _suggest_lock:
+        _suggest_inflight.discard(query_lower)
+
+def _enrich_suggestions(query):
+    """Feed upstream suggestions for query into the completer without waiting on the network."""
+    query_lower = query.lower()
+    with _suggest_lock:
+        if query_lower in _suggest_merged or query_lower in _suggest_inflight:
+            return
+    # Another worker may already have fetched it into the shared cache
+    cached = cache.get('suggest', query_lower)
+    if cached is not None:
+        completer.add_many(cached, completer.WEIGHT_SUGGESTION)
+        _mark_suggest_merged(query_lower)
+        return
+    if not netprobe.is_up('suggest'):
+        return
+    with _suggest_lock:
+        if query_lower in _suggest_inflight or len(_suggest_inflight) >= SUGGEST_INFLIGHT_MAX:
+            return
+        _suggest_inflight.add(query_lower)
+    executor.submit('suggest', get_search_suggestions, query).add_done_callback(
+        lambda _: _suggest_done(query_lower))
 
-# ── Channel avatar cache: {channel_id: (timestamp, url_or_None)} ──
-_avatar_cache = {}
 AVATAR_TTL = 600  # 10 minutes
 
 @app.route('/api/channel-avatar')
 def channel_avatar():
     """
     Fetch and redirect to a YouTube channel's avatar image.
-    Cached in-memory to avoid repeated yt-dlp calls.
+    Cached in the shared cache to avoid repeated yt-dlp calls.
     Returns 302 redirect to the avatar URL, or 404 if unavailable.
     """
     channel_id = request.args.get('channel_id', '').strip()
     if not channel_id:
         abort(404)
 
-    now = time.time()
-
-    # Return cached result if still fresh
-    cached = _avatar_cache.get(channel_id)
-    if cached:
-        ts, avatar_url = cached
-        if now - ts < AVATAR_TTL:
-            if avatar_url:
-                return redirect(avatar_url)
-            abort(404)
+    # Return cached result if still fresh ('' = channel known to have no avatar)
+    cached = cache.get('avatar', channel_id)
+    if cached is not None:
+        if cached:
+            return redirect(cached)
+        abort(404)
 
     avatar_url = None
+    shed = False
     source = get_data_source()
 
-    # Tier 1: yt-dlp
+    # Tier 1: yt-dlp (avatars are the first extractions shed under load)
     if source == 'ytdlp':
         try:
             avatar_url = get_channel_avatar(channel_id)
+        except admission.Overloaded:
+            shed = True
+            metrics.fallback('avatar', 'ytdlp', 'invidious')
         except Exception as e:
-            print(f"[Avatar] yt-dlp error for {channel_id}: {e}")
+            log.warning("[Avatar] yt-dlp error for %s: %s", channel_id, e)
 
     # Tier 2: Invidious
     if not avatar_url and source in ('ytdlp', 'invidious'):
@@ -563,15 +1023,49 @@ def channel_avatar():
             _, ch_info = invidious.get_channel(channel_id)
             avatar_url = ch_info.get('thumbnail') or ch_info.get('authorThumbnails', [{}])[-1].get('url')
         except Exception as e:
-            print(f"[Avatar] Invidious error for {channel_id}: {e}")
+            log.warning("[Avatar] Invidious error for %s: %s", channel_id, e)
 
-    _avatar_cache[channel_id] = (now, avatar_url)
+    if not avatar_url and shed:
+        # Not known to have no avatar — don't cache the miss
+        return '', 503, {'Retry-After': '1'}
+    cache.set('avatar', channel_id, avatar_url or '', AVATAR_TTL)
 
     if avatar_url:
         return redirect(avatar_url)
     abort(404)
 
 
+@app.route('/api/channel-more')
+def channel_more():
+    """
+    Infinite scroll for channel pages — the next window of uploads.
+    Returns {'videos': [...], 'has_more': bool}.
+    """
+    channel_id = request.args.get('channel_id', '').strip()
+    offset     = int(request.args.get('offset', 0))
+    if not channel_id:
+        return jsonify({'videos': [], 'has_more': False})
+
+    source = get_data_source()
+    videos = None
+
+    if source == 'ytdlp':
+        try:
+            videos = deadline.run(get_channel_window, channel_id, offset, reserve=TIER_RESERVE)
+        except Exception as e:
+            log.warning("[yt-dlp] channel-more error: %s", e)
+        if not videos:
+            metrics.fallback('channel-more', 'ytdlp', 'invidious')
+            source = 'invidious'
+
+    if source == 'invidious':
+        videos = get_channel_window_invidious(channel_id, offset)
+
+    # Mock channels are a single fixed page
+    videos = videos or []
+    search_index.record(videos)
+    return jsonify({'videos': videos, 'has_more': len(videos) >= CHANNEL_WINDOW})
+
 
 @app.route('/api/search-more')
 def search_more():
@@ -581,43 +1075,61 @@ def search_more():
     if not query:
         return jsonify({'videos': []})
 
+    cached = cache.get('search', _search_cache_key(query, offset))
+    if cached is not None:
+        _prefetch_search(query, offset + 10)
+        return jsonify({'videos': cached})
+
     source = get_data_source()
 
     if source == 'ytdlp':
         try:
-            videos = search_youtube_with_offset(query, offset, max_results=10)
+            videos = deadline.run(search_youtube_with_offset, query, offset, max_results=10,
+                                  reserve=TIER_RESERVE)
+            # An empty page isn't cached — it may be the end of the results or a blip
+            if videos:
+                _store_search(query, videos, offset)
+                _prefetch_search(query, offset + 10)
             return jsonify({'videos': videos or []})
         except Exception as e:
-            print(f"[yt-dlp] search-more error: {e}")
+            log.warning("[yt-dlp] search-more error: %s", e)
+            metrics.fallback('search-more', 'ytdlp', 'invidious')
             source = 'invidious'
 
     if source == 'invidious':
-        videos = invidious.search(query, max_results=10)
-        if videos:
-            page = videos[offset:offset + 10]
+        # One Invidious results page, sliced — it runs out after the first couple of windows
+        videos = invidious.search(query, max_results=offset + 10)
+        page = (videos or [])[offset:offset + 10]
+        if page:
+            _store_search(query, page, offset)
             return jsonify({'videos': page})
+        metrics.fallback('search-more', 'invidious', 'mock')
         source = 'mock'
 
+    # Offline: the exact page we served before, else everything we've ever
+    # seen, BM25-ranked — demo data only if both are empty
+    page = (snapshots.get('search', snapshots.search_key(query, offset))
+            or search_index.search(query, limit=10, offset=offset))
+    if page or offset > 0:
+        return jsonify({'videos': page})
     results   = mock_data.get_mock_search(query)
     page      = results[offset:offset + 10] if offset < len(results) else []
     return jsonify({'videos': page})
 
 
+@metrics.timed('suggest', 'suggest')
 def get_search_suggestions(query):
     """
     Fetch YouTube search suggestions via Google's suggestion API.
     Same data source the real YouTube search bar uses — responds in <100 ms.
     Results are cached for 5 minutes to avoid redundant network calls.
     """
-    global _suggest_cache
     query_lower = query.lower()
 
     # Return cached result if still fresh
-    cached = _suggest_cache.get(query_lower)
-    if cached:
-        ts, results = cached
-        if time.time() - ts < SUGGEST_TTL:
-            return results
+    cached = cache.get('suggest', query_lower)
+    if cached is not None:
+        return cached
 
     try:
         # Google's YouTube suggestion endpoint (same one the real YT bar uses)
@@ -631,16 +1143,18 @@ def get_search_suggestions(query):
             url,
             headers={'User-Agent': 'Mozilla/5.0', 'Accept': 'application/json'}
         )
-        with urllib.request.urlopen(req, timeout=3) as resp:
+        with resolver.urlopen(req, timeout=3) as resp:
             data = json.loads(resp.read().decode())
             # Response format: ["query", ["suggestion1", "suggestion2", ...]]
             suggestions = data[1][:8] if len(data) > 1 else []
 
-        _suggest_cache[query_lower] = (time.time(), suggestions)
+        cache.set('suggest', query_lower, suggestions, SUGGEST_TTL)
+        completer.add_many(suggestions, completer.WEIGHT_SUGGESTION)
+        _mark_suggest_merged(query_lower)
         return suggestions
 
     except Exception as e:
-        print(f"[Autocomplete] Suggestion API error: {e}")
+        log.warning("[Autocomplete] Suggestion API error: %s", e)
         return []
 
 
@@ -656,6 +1170,92 @@ def format_views(count):
     else:
         return f"{count} views"
 
+def _search_cache_key(query, offset=0):
+    return f"{query}|{offset}" if offset else query
+
+
+def _store_search(query, videos, offset=0):
+    """Cache a live search page, snapshot it and feed its cards to the offline index."""
+    cache.set('search', _search_cache_key(query, offset), videos, SEARCH_TTL)
+    snapshots.record('search', snapshots.search_key(query, offset), videos)
+    search_index.record(videos)
+    completer.add_many((v.get('title') for v in videos), completer.WEIGHT_TITLE)
+
+
+def _store_video(video_id, video_data):
+    """Cache a live watch page, snapshot it and index it as a card."""
+    cache.set('video', video_id, video_data, VIDEO_TTL)
+    snapshots.record('video', video_id, video_data)
+    search_index.record([{
+        k: video_data.get(k, '')
+        for k in ('id', 'title', 'channel', 'channel_id', 'thumbnail',
+                  'duration', 'view_count', 'upload_date')
+    }])
+
+
+def _store_channel(channel_id, videos, channel_info):
+    """Snapshot the first page of a live channel and index its cards."""
+    snapshots.record('channel', channel_id, {'videos': videos, 'info': channel_info})
+    search_index.record(videos)
+
+
+def _store_playlist(playlist_id, videos, playlist_info):
+    """Snapshot the first window of a live playlist and index its cards."""
+    snapshots.record('playlist', playlist_id, {'videos': videos, 'info': playlist_info})
+    search_index.record(videos)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Search prefetch — when page N is served, page N+1 is fetched and cached
+# in the background so infinite scroll finds it ready. Bounded by depth,
+# a small dedicated pool, and skipped entirely while the server is busy.
+# ─────────────────────────────────────────────────────────────────────
+
+@app.before_request
+def _count_request():
+    global _active_requests
+    with _load_lock:
+        _active_requests += 1
+
+@app.teardown_request
+def _uncount_request(exc):
+    global _active_requests
+    with _load_lock:
+        _active_requests -= 1
+
+
+def _prefetch_search(query, offset):
+    """Queue search page `offset` for background fetch unless it's pointless or we're busy."""
+    if offset // 10 > PREFETCH_DEPTH:
+        return
+    key = (query, offset)
+    with _load_lock:
+        if (key in _prefetch_inflight
+                or len(_prefetch_inflight) >= PREFETCH_MAX
+                or _active_requests > PREFETCH_MAX_LOAD):
+            return
+        _prefetch_inflight.add(key)
+    # Only yt-dlp pages deeper than the first; Invidious search is a single page
+    if get_data_source() != 'ytdlp' or cache.get('search', _search_cache_key(query, offset)) is not None:
+        _prefetch_inflight.discard(key)
+        return
+    executor.submit('ytdlp', _prefetch_page, query, offset)
+
+
+def _prefetch_page(query, offset):
+    try:
+        with admission.background():
+            videos = search_youtube_with_offset(query, offset, max_results=10)
+        if videos:
+            _store_search(query, videos, offset)
+            log.debug("[Prefetch] '%s' offset %s ready", query, offset)
+    except Exception as e:
+        log.debug("[Prefetch] '%s' offset %s failed: %s", query, offset, e)
+    finally:
+        with _load_lock:
+            _prefetch_inflight.discard((query, offset))
+
+
 @app.route('/')
 def home():
     """Home page with search input and trending videos"""
@@ -670,27 +1270,71 @@ def search():
     if not query:
         return redirect(url_for('home'))
 
+    with _hot_lock:
+        _hot_searches[query] += 1
+    completer.add(query, completer.WEIGHT_QUERY)
+    videos = cache.get('search', query)
+    if videos:
+        _prefetch_search(query, 10)
+        return render_template('results.html', query=query, videos=videos)
+
     source = get_data_source()
 
+    # Local-first: answer from the index now, the page swaps in live results
+    if LOCAL_FIRST and source != 'mock':
+        videos = search_index.search(query, limit=10)
+        if videos:
+            return render_template('results.html', query=query, videos=videos, provisional=True)
+
+    # Opt-in: race Invidious against a slow yt-dlp instead of waiting it out
+    if source == 'ytdlp' and hedge.HEDGE_ENABLED:
+        _, videos = hedge.race(lambda: search_youtube(query, max_results=10),
+                               lambda: invidious.search(query, max_results=10))
+        if videos:
+            _store_search(query, videos)
+            _prefetch_search(query, 10)
+            return render_template('results.html', query=query, videos=videos)
+        metrics.fallback('search', 'hedge', 'mock')
+        source = 'mock'
+
     if source == 'ytdlp':
         try:
-            videos = search_youtube(query, max_results=10)
+            videos = deadline.run(search_youtube, query, max_results=10, reserve=TIER_RESERVE)
             if videos:
+                _store_search(query, videos)
+                _prefetch_search(query, 10)
                 return render_template('results.html', query=query, videos=videos)
         except Exception as e:
-            print(f"[yt-dlp] search error: {e}")
+            log.warning("[yt-dlp] search error: %s", e)
+        metrics.fallback('search', 'ytdlp', 'invidious')
         source = 'invidious'
 
     if source == 'invidious':
         videos = invidious.search(query, max_results=10)
         if videos:
+            _store_search(query, videos)
             return render_template('results.html', query=query, videos=videos)
+        metrics.fallback('search', 'invidious', 'mock')
         source = 'mock'
 
-    videos = mock_data.get_mock_search(query)
+    # Offline: the exact page we served before, else everything we've ever
+    # seen, BM25-ranked — demo data only if both are empty
+    videos = (snapshots.get('search', snapshots.search_key(query))
+              or search_index.search(query, limit=10)
+              or mock_data.get_mock_search(query))
     return render_template('results.html', query=query, videos=videos)
 
 
+def _render_watch(video_data):
+    """watch.html playing the progressive stream that suits this viewer's connection."""
+    chosen = quality.choose(video_data.get('streams'), request.args, request.headers, request.cookies)
+    if chosen:
+        video_data = {**video_data, 'video_url': chosen['url'], 'quality': chosen['height']}
+    response = make_response(render_template('watch.html', video=video_data))
+    response.vary.update(quality.HINT_HEADERS)
+    return response
+
+
 @app.route('/watch')
 def watch():
     """Watch page — 3-tier fallback."""
@@ -698,25 +1342,62 @@ def watch():
     if not video_id:
         return redirect(url_for('home'))
 
+    video_data = cache.get('video', video_id)
+    if video_data:
+        return _render_watch(video_data)
+
     source = get_data_source()
 
+    # Opt-in: race Invidious against a slow yt-dlp instead of waiting it out
+    if source == 'ytdlp' and hedge.HEDGE_ENABLED:
+        _, video_data = hedge.race(lambda: get_video_info(video_id),
+                                   lambda: invidious.get_video_info(video_id))
+        if video_data:
+            _store_video(video_id, video_data)
+            return _render_watch(video_data)
+        metrics.fallback('watch', 'hedge', 'mock')
+        source = 'mock'
+
     if source == 'ytdlp':
         try:
-            video_data = get_video_info(video_id)
+            video_data = deadline.run(get_video_info, video_id, reserve=TIER_RESERVE)
             if video_data:
-                return render_template('watch.html', video=video_data)
+                _store_video(video_id, video_data)
+                return _render_watch(video_data)
         except Exception as e:
-            print(f"[yt-dlp] watch error: {e}")
+            log.warning("[yt-dlp] watch error: %s", e)
+        metrics.fallback('watch', 'ytdlp', 'invidious')
         source = 'invidious'
 
     if source == 'invidious':
         video_data = invidious.get_video_info(video_id)
         if video_data:
-            return render_template('watch.html', video=video_data)
+            _store_video(video_id, video_data)
+            return _render_watch(video_data)
+        metrics.fallback('watch', 'invidious', 'mock')
         source = 'mock'
 
-    video_data = mock_data.get_mock_video_info(video_id)
-    return render_template('watch.html', video=video_data)
+    video_data = snapshots.get('video', video_id) or mock_data.get_mock_video_info(video_id)
+    return _render_watch(video_data)
+
+
+@app.route('/api/stream')
+def stream_for_quality():
+    """
+    Switch quality without a new extraction: the stream for ?quality= (or
+    the client hints) from the cached watch page's ladder.
+    """
+    video_id = request.args.get('v', '')
+    video_data = cache.get('video', video_id) if video_id else None
+    chosen = quality.choose((video_data or {}).get('streams'), request.args, request.headers)
+    if not chosen:
+        return jsonify({'error': 'no cached streams for this video'}), 404
+    return jsonify({
+        'url':     chosen['url'],
+        'height':  chosen['height'],
+        'label':   chosen['label'],
+        'streams': [{'height': s['height'], 'label': s['label']} for s in video_data['streams']],
+    })
 
 
 @app.route('/channel/<channel_id>')
@@ -730,8 +1411,9 @@ def channel(channel_id):
 
     if source == 'ytdlp':
         try:
-            videos, channel_info = get_channel_videos(channel_id)
+            videos, channel_info = deadline.run(get_channel_videos, channel_id, reserve=TIER_RESERVE)
             if videos:
+                _store_channel(channel_id, videos, channel_info)
                 channel_name = channel_info.get('title') or channel_name_param or 'Channel'
                 if channel_name == 'Channel' and videos:
                     channel_name = videos[0].get('channel', 'Channel')
@@ -739,49 +1421,70 @@ def channel(channel_id):
                                        channel_id=channel_id,
                                        channel_name=channel_name,
                                        channel_thumbnail=channel_info.get('thumbnail'),
-                                       videos=videos)
+                                       videos=videos,
+                                       has_more=True)
         except Exception as e:
-            print(f"[yt-dlp] channel error: {e}")
+            log.warning("[yt-dlp] channel error: %s", e)
+        metrics.fallback('channel', 'ytdlp', 'invidious')
         source = 'invidious'
 
     if source == 'invidious':
         videos, channel_info = invidious.get_channel(channel_id)
         if videos:
+            _store_channel(channel_id, videos, channel_info)
             channel_name = channel_info.get('title') or channel_name_param or 'Channel'
             return render_template('channel.html',
                                    channel_id=channel_id,
                                    channel_name=channel_name,
                                    channel_thumbnail=channel_info.get('thumbnail', ''),
-                                   videos=videos)
+                                   videos=videos,
+                                   has_more=True)
+        metrics.fallback('channel', 'invidious', 'mock')
         source = 'mock'
 
-    videos, channel_info = mock_data.get_mock_channel(channel_id)
+    snapshot = snapshots.get('channel', channel_id)
+    if snapshot:
+        videos, channel_info = snapshot['videos'], snapshot['info']
+    else:
+        videos, channel_info = mock_data.get_mock_channel(channel_id)
     channel_name = channel_name_param or channel_info.get('title', 'Demo Channel')
     return render_template('channel.html',
                            channel_id=channel_id,
                            channel_name=channel_name,
                            channel_thumbnail=channel_info.get('thumbnail', ''),
-                           videos=videos)
+                           videos=videos,
+                           has_more=False)
 
 
 
-def get_playlist_info(playlist_id):
+@metrics.timed('ytdlp', 'playlist')
+def get_playlist_info(playlist_id, offset=0, count=PLAYLIST_WINDOW):
     """
-    Fetch playlist metadata and video list using yt-dlp.
+    Fetch playlist metadata and one window of its videos using yt-dlp,
+    entries [offset, offset + count). Each window is cached on its own so
+    a playlist of any length renders in constant time.
     Returns tuple (videos, playlist_info).
     """
-    print(f"Fetching playlist: {playlist_id}")
+    key = f"{playlist_id}|{offset}"
+    cached = cache.get('playlist_window', key)
+    if cached:
+        return cached['videos'], cached['info']
+
+    log.debug("[Playlist] Fetching playlist: %s [%s:%s]", playlist_id, offset, offset + count)
     try:
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
+            'logger': logs.YTDLP_LOGGER,
             'extract_flat': True,
             'ignoreerrors': True,
-            'playlistend': 50,
+            'playliststart': offset + 1,   # 1-based, inclusive
+            'playlistend': offset + count,
         }
         url = f"https://www.youtube.com/playlist?list={playlist_id}"
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            result = ydl.extract_info(url, download=False)
+        with ytpool.YoutubeDL(ydl_opts) as ydl:
+            with admission.slot('playlist'), tracing.span('ytdlp', 'playlist'):
+                result = ydl.extract_info(url, download=False)
             if not result:
                 return [], {}
 
@@ -822,19 +1525,86 @@ def get_playlist_info(playlist_id):
             # Fill thumbnail from first video if missing
             if not playlist_info['thumbnail'] and videos:
                 playlist_info['thumbnail'] = videos[0]['thumbnail']
-            if not playlist_info['video_count']:
-                playlist_info['video_count'] = len(videos)
+            if not playlist_info['video_count'] and len(videos) < count:
+                # A short window is the last one, so the total is known
+                playlist_info['video_count'] = offset + len(videos)
 
-            print(f"Playlist '{playlist_info['title']}': {len(videos)} videos")
+            log.debug("[Playlist] '%s': %s videos", playlist_info['title'], len(videos))
+            if videos:
+                cache.set('playlist_window', key, {'videos': videos, 'info': playlist_info}, PLAYLIST_TTL)
             return videos, playlist_info
 
+    except admission.Overloaded:
+        raise   # shed — the caller takes the next tier
     except Exception as e:
-        print(f"Error fetching playlist: {e}")
-        import traceback
-        traceback.print_exc()
+        log.warning("[Playlist] Error fetching playlist: %s", e, exc_info=True)
         return [], {}
 
 
+def get_playlist_window_invidious(playlist_id, offset, count=PLAYLIST_WINDOW):
+    """
+    One window of a playlist via Invidious. Invidious pages are far larger
+    than our windows, so pages are accumulated per playlist and windows are
+    sliced from that list, fetching the next page only when needed.
+    Returns tuple (videos, playlist_info).
+    """
+    now = time.time()
+    cached = cache.get('inv_playlist', playlist_id)
+    # Extend a copy — concurrent scrolls just race to store theirs
+    state = ({**cached, 'videos': list(cached['videos'])} if cached
+             else {'videos': [], 'info': {}, 'page': 0, 'done': False, 'at': now})
+
+    fetched = False
+    while len(state['videos']) < offset + count and not state['done']:
+        videos, info = invidious.get_playlist(playlist_id, max_results=None, page=state['page'] + 1)
+        if videos is None:
+            break   # every instance failed — serve what we already have
+        seen = {v['id'] for v in state['videos']}
+        fresh = [v for v in videos if v['id'] not in seen]
+        state['videos'].extend(fresh)
+        state['info'] = state['info'] or info
+        state['page'] += 1
+        state['done'] = not fresh
+        fetched = True
+
+    # The page list expires PLAYLIST_TTL after its first page, however far it grows
+    if fetched:
+        cache.set('inv_playlist', playlist_id, state, max(1, PLAYLIST_TTL - (now - state['at'])))
+    return state['videos'][offset:offset + count], state['info']
+
+
+@app.route('/api/playlist-more')
+def playlist_more():
+    """
+    Infinite scroll for playlist pages — the next window of videos.
+    Returns {'videos': [...], 'has_more': bool}.
+    """
+    playlist_id = request.args.get('playlist_id', '').strip()
+    offset      = int(request.args.get('offset', 0))
+    if not playlist_id:
+        return jsonify({'videos': [], 'has_more': False})
+
+    source = get_data_source()
+    videos = None
+
+    if source == 'ytdlp':
+        try:
+            videos, _ = deadline.run(get_playlist_info, playlist_id, offset, reserve=TIER_RESERVE)
+        except Exception as e:
+            log.warning("[yt-dlp] playlist-more error: %s", e)
+        if not videos:
+            metrics.fallback('playlist-more', 'ytdlp', 'invidious')
+            source = 'invidious'
+
+    if source == 'invidious':
+        videos, _ = get_playlist_window_invidious(playlist_id, offset)
+
+    # Mock playlists are a single fixed page
+    videos = videos or []
+    search_index.record(videos)
+    return jsonify({'videos': videos, 'has_more': len(videos) >= PLAYLIST_WINDOW})
+
+
 @app.route('/playlist/<playlist_id>')
 def playlist(playlist_id):
     """Playlist page — 3-tier fallback."""
@@ -845,59 +1615,74 @@ def playlist(playlist_id):
 
     if source == 'ytdlp':
         try:
-            videos, playlist_info = get_playlist_info(playlist_id)
+            videos, playlist_info = deadline.run(get_playlist_info, playlist_id, reserve=TIER_RESERVE)
             if videos:
+                _store_playlist(playlist_id, videos, playlist_info)
                 return render_template('playlist.html',
                                        playlist_id=playlist_id,
                                        playlist=playlist_info,
-                                       videos=videos)
+                                       videos=videos,
+                                       has_more=len(videos) >= PLAYLIST_WINDOW)
         except Exception as e:
-            print(f"[yt-dlp] playlist error: {e}")
+            log.warning("[yt-dlp] playlist error: %s", e)
+        metrics.fallback('playlist', 'ytdlp', 'invidious')
         source = 'invidious'
 
     if source == 'invidious':
-        videos, playlist_info = invidious.get_playlist(playlist_id)
+        videos, playlist_info = get_playlist_window_invidious(playlist_id, 0)
         if videos:
+            _store_playlist(playlist_id, videos, playlist_info)
             return render_template('playlist.html',
                                    playlist_id=playlist_id,
                                    playlist=playlist_info,
-                                   videos=videos)
+                                   videos=videos,
+                                   has_more=len(videos) >= PLAYLIST_WINDOW)
+        metrics.fallback('playlist', 'invidious', 'mock')
         source = 'mock'
 
-    videos, playlist_info = mock_data.get_mock_playlist(playlist_id)
+    snapshot = snapshots.get('playlist', playlist_id)
+    if snapshot:
+        videos, playlist_info = snapshot['videos'], snapshot['info']
+    else:
+        videos, playlist_info = mock_data.get_mock_playlist(playlist_id)
     return render_template('playlist.html',
                            playlist_id=playlist_id,
                            playlist=playlist_info,
-                           videos=videos)
+                           videos=videos,
+                           has_more=False)
 
 
-def get_video_info(video_id):
+@metrics.timed('ytdlp', 'video')
+def get_video_info(video_id, profile='stream'):
     """
     Get detailed video information using yt-dlp
     Returns video metadata dictionary
+    profile (ytpool.PROFILES): 'stream' for the watch page, 'minimal' when
+    only the metadata is needed (video_url may be None), 'full' for all formats
     """
-    print(f"Fetching video info for ID: {video_id}")  # Debug
+    log.debug("[yt-dlp] Fetching video info for ID: %s (%s)", video_id, profile)
     try:
-        ydl_opts = {
+        ydl_opts = ytpool.profile_opts({
             'quiet': True,
             'no_warnings': True,
-            'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+            'logger': logs.YTDLP_LOGGER,
             'get_comments': False, # Extremely slow, disable by default
             'extract_flat': False,
             'skip_download': True,
             'ignoreerrors': True,
-        }
+        }, profile)
         
         url = f"https://www.youtube.com/watch?v={video_id}"
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+        with ytpool.YoutubeDL(ydl_opts, shape='video') as ydl:
+            with admission.slot('video'), tracing.span('ytdlp', f'video/{profile}'):
+                info = ydl.extract_info(url, download=False)
             
             if not info:
-                print("ERROR: No info returned from yt-dlp")
+                log.warning("[yt-dlp] No info returned")
                 return None
             
-            print(f"Successfully fetched info for: {info.get('title', 'Unknown')}")
+            log.debug("[yt-dlp] Successfully fetched info for: %s", info.get('title', 'Unknown'))
             
             # Find the best progressive video (video + audio)
             video_url = None
@@ -915,11 +1700,15 @@ def get_video_info(video_id):
             # Sort by height (quality)
             progressive_formats.sort(key=lambda x: x.get('height') or 0, reverse=True)
             
+            # The whole ladder is cached; each request picks a rung (quality.py)
+            streams = quality.ladder([quality.stream(f.get('url'), f.get('height'), f.get('tbr'))
+                                      for f in progressive_formats])
+            
             if progressive_formats:
                 video_url = progressive_formats[0]['url']
-                print(f"Found progressive MP4 video URL: {progressive_formats[0].get('format_id')}")
+                log.debug("[yt-dlp] Found progressive MP4 video URL: %s", progressive_formats[0].get('format_id'))
             else:
-                print("No progressive MP4 format found. Falling back to iframe.")
+                log.debug("[yt-dlp] No progressive MP4 format found. Falling back to iframe.")
             
             # Extract video data
             video = {
@@ -934,22 +1723,26 @@ def get_video_info(video_id):
                 'upload_date': format_date(info.get('upload_date', '')),
                 'description': info.get('description', 'No description available'),
                 'thumbnail': info.get('thumbnail', ''),
-                'duration': format_duration(info.get('duration', 0)),
+                'duration': invidious.fmt_dur(info.get('duration', 0)),
                 'video_url': video_url,
+                'streams': streams,
                 'comments': extract_comments(info.get('comments', [])),
             }
             
-            # Fetch channel avatar specifically if we didn't get it
-            if not video.get('channel_thumbnail') and video.get('channel_id'):
-                print(f"Fetching separate avatar for channel: {video['channel_id']}")
-                video['channel_thumbnail'] = get_channel_avatar(video['channel_id'])
+            # Fetch channel avatar specifically if we didn't get it (a second extraction)
+            if not video.get('channel_thumbnail') and video.get('channel_id') and profile != 'minimal':
+                log.debug("[yt-dlp] Fetching separate avatar for channel: %s", video['channel_id'])
+                try:
+                    video['channel_thumbnail'] = get_channel_avatar(video['channel_id'])
+                except admission.Overloaded:
+                    pass   # the avatar is optional — never throw away the finished video for it
             
             return video
     
+    except admission.Overloaded:
+        raise   # shed — the caller takes the next tier
     except Exception as e:
-        print(f"ERROR fetching video info: {e}")
-        import traceback
-        traceback.print_exc()
+        log.warning("[yt-dlp] Error fetching video info: %s", e, exc_info=True)
         return None
 
 def format_number(num):
@@ -1017,11 +1810,72 @@ def extract_comments(comments_data):
                 'timestamp': comment.get('timestamp', 0)
             })
         except Exception as e:
-            print(f"Error parsing comment: {e}")
+            log.debug("[Comments] Error parsing comment: %s", e)
             continue
             
     return formatted_comments
 
+# ─────────────────────────────────────────────────────────────────────
+# WARM-UP  (scheduler.py — boot + periodic, long-lived servers only)
+#
+#  • trending pool rebuilt shortly before TRENDING_TTL runs out
+#  • WARM_TOPICS niche topics pre-searched (feeds /search and the pool)
+#  • most-requested searches re-fetched before SEARCH_TTL runs out
+# ─────────────────────────────────────────────────────────────────────
+WARM_TOPICS      = int(os.environ.get('VIEWTUBE_WARM_TOPICS', 6))
+WARM_HOT_QUERIES = 10
+
+
+def _warm_search(query):
+    """Fetch a search page via yt-dlp → Invidious and cache it. Skipped offline."""
+    source = get_data_source()
+    videos = None
+    if source == 'ytdlp':
+        try:
+            videos = search_youtube(query, max_results=10)
+        except Exception as e:
+            log.warning("[Warm] yt-dlp search error for '%s': %s", query, e)
+    if not videos and source in ('ytdlp', 'invidious'):
+        videos = invidious.search(query, max_results=10)
+    if videos:
+        _store_search(query, videos)
+
+
+def _background(job):
+    """Run a warm-up job's extractions behind every user request (admission.py)."""
+    def run():
+        with admission.background():
+            job()
+    return run
+
+
+def warm_topics():
+    for topic in random.sample(invidious.NICHE_TOPICS, k=min(WARM_TOPICS, len(invidious.NICHE_TOPICS))):
+        _warm_search(topic)
+
+
+def refresh_hot_searches():
+    with _hot_lock:
+        hot = [q for q, _ in _hot_searches.most_common(WARM_HOT_QUERIES)]
+        _hot_searches.clear()   # decay: only queries still being asked stay hot
+    for query in hot:
+        _warm_search(query)
+
+
+if SERVER_PROCESS and not os.environ.get('VERCEL') and os.environ.get('VIEWTUBE_WARMUP', '1') != '0':
+    # Topics first so the trending build can reuse their results
+    scheduler.every(SEARCH_TTL * 0.8, _background(warm_topics), name='topics')
+    scheduler.every(TRENDING_TTL * 0.9, _background(build_trending_pool), name='trending',
+                    start_delay=20)
+    scheduler.every(SEARCH_TTL * 0.8, _background(refresh_hot_searches), name='hot-searches',
+                    run_at_start=False)
+    scheduler.start()
+    executor.submit('local', ytpool.prestart)   # VIEWTUBE_YTDLP_MODE=process: warm the workers now
+
+# Autocomplete starts from every title the local index has seen
+if SERVER_PROCESS:
+    executor.submit('local', completer.seed_from_index, search_index)
+
 # Export the app for Vercel
 # This is required for Vercel's serverless function handler
 application = app
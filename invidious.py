@@ -10,12 +10,24 @@ API docs:
 """
 
 import json
-import socket
+import time
 import urllib.request
 import urllib.parse
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeout, as_completed
+
+import executor
+import netprobe
+import deadline
+import resolver
+import metrics
+import logs
+import quality
+import tracing
+
+log = logs.get('invidious')
 
 TIMEOUT = 3   # seconds per attempt — fail fast, move to next
+MIN_ATTEMPT = 0.5   # don't start an attempt with less request budget than this
 
 
 # ─────────────────────────────────────────────────────────────────────
@@ -72,6 +84,12 @@ NICHE_TOPICS = [
 # Low-level HTTP helper
 # ─────────────────────────────────────────────────────────────────────
 
+def _fetch_json(req):
+    # Never wait past the request deadline, whatever TIMEOUT says
+    with resolver.urlopen(req, timeout=deadline.current().clamp(TIMEOUT)) as r:
+        return json.loads(r.read().decode())
+
+
 def _http_get(url):
     """Fetch URL and return parsed JSON, or raise on failure."""
     req = urllib.request.Request(
@@ -81,8 +99,16 @@ def _http_get(url):
             "Accept": "application/json",
         }
     )
-    with urllib.request.urlopen(req, timeout=TIMEOUT) as r:
-        return json.loads(r.read().decode())
+    # Every call to a mirror — search, watch, channel, playlist, trending —
+    # queues in that host's executor lane; time spent queued counts too
+    netloc = urllib.parse.urlsplit(url).netloc
+    with tracing.span('http', netloc):
+        fut = executor.submit("invidious:" + netloc, _fetch_json, req)
+        try:
+            return fut.result(timeout=deadline.current().clamp(TIMEOUT))
+        except FutureTimeout:
+            fut.cancel()   # still queued: never sent; running: finishes in the background
+            raise TimeoutError(f"{netloc} timed out") from None
 
 
 def _try_instances(instances, path, params=None, cache_attr=None):
@@ -94,20 +120,29 @@ def _try_instances(instances, path, params=None, cache_attr=None):
 
     qs = ("?" + urllib.parse.urlencode(params)) if params else ""
 
-    # Build trial list: cached instance first, then rest
+    # Build trial list: cached instance first, then the rest — fastest
+    # reachable mirrors per the background prober, known-down ones last
     cached = globals().get(cache_attr) if cache_attr else None
-    trial  = ([cached] + [i for i in instances if i != cached]) if cached else instances
+    rest   = netprobe.ranked([i for i in instances if i != cached])
+    trial  = ([cached] + rest) if cached else rest
 
     for base in trial:
+        left = deadline.current().remaining()
+        if left is not None and left < MIN_ATTEMPT:
+            log.info("[Proxy] Deadline reached, skipping remaining instances")
+            break
         url = base + path + qs
+        start = time.perf_counter()
         try:
             data = _http_get(url)
+            metrics.instance_duration.observe(time.perf_counter() - start, base, 'ok')
             if cache_attr:
                 globals()[cache_attr] = base
-            print(f"[Proxy] OK  {base}")
+            log.debug("[Proxy] OK  %s", base)
             return base, data
         except Exception as e:
-            print(f"[Proxy] FAIL {base}: {e}")
+            metrics.instance_duration.observe(time.perf_counter() - start, base, 'error')
+            log.debug("[Proxy] FAIL %s: %s", base, e)
             if cached == base and cache_attr:
                 globals()[cache_attr] = None   # invalidate
             continue
@@ -178,7 +213,7 @@ def _piped_trending(max_results=12):
     per_topic = max(5, max_results // 3)
     all_videos, seen = [], set()
     for topic in selected:
-        print(f"  [Piped] trending topic: '{topic}'")
+        log.debug("[Piped] trending topic: '%s'", topic)
         _, data = _try_instances(PIPED_INSTANCES, "/search",
                                  {"q": topic, "filter": "videos"}, "_piped_instance")
         if data and "items" in data:
@@ -208,6 +243,12 @@ def _piped_video_info(video_id):
 
     # Best mp4 stream
     video_url = None
+    streams = quality.ladder([
+        quality.stream(s.get("url"), s.get("height") or quality.parse_height(s.get("quality")),
+                       (s.get("bitrate") or 0) / 1000)
+        for s in data.get("videoStreams", [])
+        if s.get("mimeType", "").startswith("video/mp4") and s.get("videoOnly") is False
+    ])
     for stream in data.get("videoStreams", []):
         if stream.get("mimeType", "").startswith("video/mp4") and stream.get("videoOnly") is False:
             video_url = stream.get("url")
@@ -232,6 +273,7 @@ def _piped_video_info(video_id):
         "upload_date":      data.get("uploadDate", ""),
         "description":      data.get("description", ""),
         "video_url":        video_url,
+        "streams":          streams,
         "comments":         [],
     }
 
@@ -279,21 +321,21 @@ def _inv_trending(max_results=12):
     per_topic = max(5, max_results // 3)
 
     def _fetch_topic(topic):
-        print(f"  [Invidious] trending topic: '{topic}'")
+        log.debug("[Invidious] trending topic: '%s'", topic)
         _, data = _try_instances(INVIDIOUS_INSTANCES, "/api/v1/search",
                                  {"q": topic, "type": "video"}, "_inv_instance")
         if data and isinstance(data, list):
             return [_inv_video(v) for v in data[:per_topic] if v.get("videoId")]
         return []
 
+    # Each topic's requests queue in the lane of whichever mirror they hit (_http_get)
     all_videos, seen = [], set()
-    with ThreadPoolExecutor(max_workers=3) as pool:
-        futures = {pool.submit(_fetch_topic, t): t for t in selected}
-        for fut in as_completed(futures):
-            for vid in (fut.result() or []):
-                if vid["id"] and vid["id"] not in seen:
-                    seen.add(vid["id"])
-                    all_videos.append(vid)
+    futures = [deadline.submit(_fetch_topic, t) for t in selected]
+    for fut in as_completed(futures):
+        for vid in (fut.result() or []):
+            if vid["id"] and vid["id"] not in seen:
+                seen.add(vid["id"])
+                all_videos.append(vid)
 
     random.shuffle(all_videos)
     return all_videos[:max_results] or None
@@ -327,6 +369,10 @@ def _inv_video_info(video_id):
         if fmt.get("container") == "mp4":
             video_url = fmt.get("url")
             break
+    streams = quality.ladder([
+        quality.stream(fmt.get("url"), quality.parse_height(fmt.get("resolution") or fmt.get("size")))
+        for fmt in data.get("formatStreams", []) if fmt.get("container") == "mp4"
+    ])
     ch_thumbs = data.get("authorThumbnails") or []
     return {
         "id":               vid_id,
@@ -342,6 +388,7 @@ def _inv_video_info(video_id):
         "upload_date":      "",
         "description":      data.get("description", ""),
         "video_url":        video_url,
+        "streams":          streams,
         "comments":         [],
     }
 
@@ -351,19 +398,20 @@ def _inv_video_info(video_id):
 # Each function tries Piped first, then Invidious, returns None on total failure.
 # ─────────────────────────────────────────────────────────────────────
 
+def probe_targets():
+    """{name: probe_url} for netprobe — one cheap stats call per mirror."""
+    return {base: base + "/api/v1/stats" for base in PIPED_INSTANCES + INVIDIOUS_INSTANCES}
+
+
 def is_available():
-    """Returns True if any proxy (Piped or Invidious) is reachable."""
-    for base in PIPED_INSTANCES[:2] + INVIDIOUS_INSTANCES[:2]:
-        host = base.replace("https://","").replace("http://","").split("/")[0]
-        try:
-            socket.setdefaulttimeout(4)
-            socket.getaddrinfo(host, 443)
-            return True
-        except OSError:
-            continue
-    return False
+    """
+    Returns True if any proxy (Piped or Invidious) answered in the
+    background prober's latest sweep. Never touches the network itself.
+    """
+    return any(netprobe.is_up(base) for base in PIPED_INSTANCES + INVIDIOUS_INSTANCES)
 
 
+@metrics.timed('invidious', 'trending')
 def get_trending(max_results=12):
     """
     Fetch niche dev/programming content for the home page.
@@ -372,26 +420,29 @@ def get_trending(max_results=12):
     videos = _piped_trending(max_results)
     if videos:
         return videos
-    print("[Proxy] Piped niche trending failed, trying Invidious...")
+    log.debug("[Proxy] Piped niche trending failed, trying Invidious...")
     return _inv_trending(max_results)
 
 
+@metrics.timed('invidious', 'search')
 def search(query, max_results=10):
     videos = _piped_search(query, max_results)
     if videos:
         return videos
-    print("[Proxy] Piped search failed, trying Invidious...")
+    log.debug("[Proxy] Piped search failed, trying Invidious...")
     return _inv_search(query, max_results)
 
 
+@metrics.timed('invidious', 'video')
 def get_video_info(video_id):
     info = _piped_video_info(video_id)
     if info:
         return info
-    print("[Proxy] Piped video info failed, trying Invidious...")
+    log.debug("[Proxy] Piped video info failed, trying Invidious...")
     return _inv_video_info(video_id)
 
 
+@metrics.timed('invidious', 'channel')
 def get_channel(channel_id, max_results=12):
     """Fetch channel videos — Invidious only (Piped uses different channel IDs)."""
     _, data = _try_instances(INVIDIOUS_INSTANCES, f"/api/v1/channels/{channel_id}",
@@ -407,10 +458,37 @@ def get_channel(channel_id, max_results=12):
     return videos, channel_info
 
 
-def get_playlist(playlist_id, max_results=50):
-    """Fetch playlist videos and metadata via Invidious API."""
+@metrics.timed('invidious', 'channel_page')
+def get_channel_videos_page(channel_id, continuation=None):
+    """
+    Fetch one page of a channel's uploads via Invidious.
+    Returns (videos, next_continuation); next_continuation is None on the last page.
+    Returns (None, None) when every instance fails.
+    """
+    params = {"continuation": continuation} if continuation else None
+    _, data = _try_instances(INVIDIOUS_INSTANCES, f"/api/v1/channels/{channel_id}/videos",
+                             params, "_inv_instance")
+    if data is None:
+        return None, None
+    # Newer instances wrap the page, older ones return a bare list
+    if isinstance(data, dict):
+        videos_raw, next_token = data.get("videos") or [], data.get("continuation")
+    else:
+        videos_raw, next_token = data, None
+    videos = [_inv_video(v) for v in videos_raw if v.get("videoId")]
+    return videos, (next_token or None)
+
+
+@metrics.timed('invidious', 'playlist')
+def get_playlist(playlist_id, max_results=50, page=1):
+    """
+    Fetch one page of playlist videos and metadata via Invidious API.
+    Invidious serves long playlists in fixed-size pages (?page=N, 1-based);
+    max_results=None keeps the whole page.
+    """
+    params = {"page": page} if page > 1 else None
     _, data = _try_instances(INVIDIOUS_INSTANCES, f"/api/v1/playlists/{playlist_id}",
-                             cache_attr="_inv_instance")
+                             params, "_inv_instance")
     if not data:
         return None, {}
 
@@ -0,0 +1,121 @@
+"""
+logs.py — Leveled, non-blocking logging for every ViewTube module.
+
+Hot paths used to print() per search result, per Invidious attempt, and
+let yt-dlp write its progress to stdout (quiet: False) — synchronous
+console I/O inside every request. Modules now log through here instead:
+
+    log = logs.get('invidious')
+    log.debug("[Proxy] OK  %s", base)       # %-args: never formatted if filtered
+
+Records go into an in-memory queue; one listener thread formats them and
+writes to stdout, so a request only pays for a level check and a
+queue.put. DEBUG records are additionally sampled (VIEWTUBE_LOG_SAMPLE,
+fraction kept) so turning DEBUG on in production doesn't flood the log.
+
+  VIEWTUBE_LOG_LEVEL=DEBUG|INFO|WARNING   (default INFO)
+  VIEWTUBE_LOG_FORMAT=text|json           (default text)
+  VIEWTUBE_LOG_SAMPLE=0.05                (default 1.0 — keep all DEBUG)
+
+yt-dlp is wired in with YTDLP_LOGGER ('logger' in ydl_opts).
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+
+LEVEL        = os.environ.get('VIEWTUBE_LOG_LEVEL', 'INFO').upper()
+FORMAT       = os.environ.get('VIEWTUBE_LOG_FORMAT', 'text').lower()
+DEBUG_SAMPLE = float(os.environ.get('VIEWTUBE_LOG_SAMPLE', '1.0'))
+
+_root     = logging.getLogger('viewtube')
+_listener = None
+_lock     = threading.Lock()
+
+
+class _JsonFormatter(logging.Formatter):
+    """One JSON object per line — for log shippers."""
+
+    def format(self, record):
+        entry = {
+            'ts':     round(record.created, 3),
+            'level':  record.levelname,
+            'logger': record.name,
+            'msg':    record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class _SampleFilter(logging.Filter):
+    """Keep every INFO+ record, and DEBUG_SAMPLE of the DEBUG ones."""
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or random.random() < DEBUG_SAMPLE
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    The stock QueueHandler formats the message in the calling thread.
+    Everything stays in-process, so hand the record over as-is and let
+    the listener thread pay for formatting.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def setup():
+    """Attach the queue handler and start the listener thread (idempotent)."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(_JsonFormatter() if FORMAT == 'json' else
+                            logging.Formatter('%(asctime)s %(levelname)-7s %(message)s'))
+        q = queue.SimpleQueue()
+        handler = _QueueHandler(q)
+        handler.addFilter(_SampleFilter())
+        _root.addHandler(handler)
+        _root.setLevel(getattr(logging, LEVEL, logging.INFO))
+        _root.propagate = False
+        _listener = logging.handlers.QueueListener(q, stream)
+        _listener.start()
+        atexit.register(_listener.stop)   # flush what's queued on shutdown
+
+
+def get(name):
+    """Logger for one module, under the shared 'viewtube' root."""
+    setup()
+    return _root.getChild(name)
+
+
+class _YtdlpLogger:
+    """
+    yt-dlp 'logger' adapter. Its screen output (progress, 'Extracting
+    URL', ...) and warnings become DEBUG; its errors WARNING — the route
+    that called it logs the outcome anyway.
+    """
+
+    def __init__(self):
+        self._log = get('ytdlp')
+
+    def debug(self, msg):
+        self._log.debug("[yt-dlp] %s", msg)
+
+    info = debug
+    warning = debug
+
+    def error(self, msg):
+        self._log.warning("[yt-dlp] %s", msg)
+
+
+YTDLP_LOGGER = _YtdlpLogger()
@@ -0,0 +1,189 @@
+"""
+metrics.py — Prometheus-style counters and latency histograms.
+
+The only signals used to be print() lines ('[Proxy] OK', '[ViewTube]
+Source: ...'), so there was no way to tell where request time went or
+whether a TTL was too short. This module keeps a few in-process metric
+families and renders them in the Prometheus text exposition format for
+GET /metrics:
+
+  viewtube_request_duration_seconds   {route, status}          histogram
+  viewtube_tier_duration_seconds      {tier, op, outcome}      histogram
+  viewtube_instance_duration_seconds  {instance, outcome}      histogram
+  viewtube_fallback_total             {route, from, to}        counter
+  viewtube_cache_requests_total       {ns, result}             counter
+  viewtube_cache_evictions_total      {backend, ns, reason}    counter
+  viewtube_admission_wait_seconds     {class, result}          histogram
+  viewtube_executor_wait_seconds      {lane}                   histogram
+  viewtube_executor_tasks             {upstream, state}        gauge
+
+Ratios (cache hit rate, tier failure rate) are left to PromQL, e.g.
+  sum by (ns) (rate(viewtube_cache_requests_total{result="hit"}[5m]))
+    / sum by (ns) (rate(viewtube_cache_requests_total[5m]))
+
+No client library needed. Values are per process — with several gunicorn
+workers, scrape each one or sum them.
+"""
+
+import functools
+import threading
+import time
+
+# Seconds — spans a cached hit (~1 ms) to a cut-off yt-dlp extraction
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_lock = threading.Lock()
+
+
+class Counter:
+    def __init__(self, name, help, labels):
+        self.name, self.help, self.labels = name, help, labels
+        self._values = {}   # {label values tuple: float}
+
+    def inc(self, *labels, value=1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with _lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_fmt_labels(self.labels, labels)} {_fmt_num(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels, buckets=BUCKETS):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = tuple(buckets)
+        self._values = {}   # {label values tuple: [bucket counts..., sum, count]}
+
+    def observe(self, value, *labels):
+        with _lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1     # cumulative — every bucket at or above value
+            entry[-2] += value
+            entry[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with _lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for labels, entry in items:
+            for bound, count in zip(self.buckets, entry):
+                le = _fmt_labels(self.labels + ('le',), labels + (_fmt_num(bound),))
+                lines.append(f"{self.name}_bucket{le} {count}")
+            inf = _fmt_labels(self.labels + ('le',), labels + ('+Inf',))
+            lines.append(f"{self.name}_bucket{inf} {entry[-1]}")
+            base = _fmt_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{base} {_fmt_num(entry[-2])}")
+            lines.append(f"{self.name}_count{base} {entry[-1]}")
+        return lines
+
+
+class Gauge:
+    """Current values read at scrape time from collect() → {label values tuple: number}."""
+
+    def __init__(self, name, help, labels, collect=None):
+        self.name, self.help, self.labels = name, help, labels
+        self.collect = collect or dict
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_fmt_labels(self.labels, labels)} {_fmt_num(value)}")
+        return lines
+
+
+def _fmt_labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for n, v in zip(names, values):
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{n}="{v}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _fmt_num(v):
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Metric families
+# ─────────────────────────────────────────────────────────────────────
+
+request_duration = Histogram(
+    "viewtube_request_duration_seconds", "Time to answer an HTTP request.",
+    ("route", "status"))
+tier_duration = Histogram(
+    "viewtube_tier_duration_seconds", "Latency of one call into a data tier.",
+    ("tier", "op", "outcome"))
+instance_duration = Histogram(
+    "viewtube_instance_duration_seconds", "Latency of one HTTP attempt against an Invidious instance.",
+    ("instance", "outcome"))
+fallbacks = Counter(
+    "viewtube_fallback_total", "Requests that fell from one tier to the next.",
+    ("route", "from", "to"))
+cache_requests = Counter(
+    "viewtube_cache_requests_total", "Cache lookups by namespace and result (hit/miss).",
+    ("ns", "result"))
+cache_evictions = Counter(
+    "viewtube_cache_evictions_total", "Cache entries removed before being read again.",
+    ("backend", "ns", "reason"))
+admission_wait = Histogram(
+    "viewtube_admission_wait_seconds", "Time a yt-dlp extraction queued for a slot (result: admitted/shed).",
+    ("class", "result"))
+executor_wait = Histogram(
+    "viewtube_executor_wait_seconds", "Time a task queued in its executor lane before starting.",
+    ("lane",))
+executor_tasks = Gauge(
+    "viewtube_executor_tasks", "Executor tasks per upstream lane (state: running/queued).",
+    ("upstream", "state"))   # collect() is set by executor.py
+
+REGISTRY = [request_duration, tier_duration, instance_duration,
+            fallbacks, cache_requests, cache_evictions, admission_wait,
+            executor_wait, executor_tasks]
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Helpers used by index.py / invidious.py / cache.py
+# ─────────────────────────────────────────────────────────────────────
+
+def timed(tier, op):
+    """
+    Decorator: record each call's latency under {tier, op, outcome}.
+    outcome is 'ok' (truthy result), 'empty' (None / [] — the tier had
+    nothing) or 'error' (raised).
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = fn(*args, **kwargs)
+                # (videos, info) tuples are empty when the video list is
+                outcome = 'ok' if (result[0] if isinstance(result, tuple) else result) else 'empty'
+                return result
+            finally:
+                tier_duration.observe(time.perf_counter() - start, tier, op, outcome)
+        return inner
+    return wrap
+
+
+def fallback(route, src, dst):
+    fallbacks.inc(route, src, dst)
+
+
+def render():
+    """All metrics in Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,116 @@
+"""
+netprobe.py — Background network-tier prober.
+
+Tier detection used to run socket.getaddrinfo() inline in the request path
+(and set the process-wide socket.setdefaulttimeout as a side effect). Now a
+daemon thread probes every target on a fixed interval with a real HTTPS
+request, records reachability + latency, and publishes an immutable
+snapshot. Requests only ever read the latest snapshot — they never block
+on tier detection.
+
+Targets are registered by the caller ({name: probe_url}); this module
+knows nothing about YouTube or Invidious specifically.
+"""
+
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import executor
+import logs
+import resolver
+
+log = logs.get('netprobe')
+
+PROBE_INTERVAL = 30    # seconds between sweeps
+PROBE_TIMEOUT  = 4     # seconds per target — targets are probed in parallel
+# The host answered but doesn't serve the probe URL itself — it's still up.
+# Anything else (403 blocked, 429 rate-limited, 5xx) is routed around.
+UP_STATUSES    = {404, 405}
+
+_targets  = {}         # {name: url}
+_snapshot = {'at': 0, 'targets': {}}   # replaced wholesale, never mutated
+_thread   = None
+_lock     = threading.Lock()
+
+
+def _probe(url):
+    """One HTTPS round-trip. Returns (ok, latency_seconds, error)."""
+    req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0 (ViewTube/1.0)"})
+    start = time.perf_counter()
+    try:
+        with resolver.urlopen(req, timeout=PROBE_TIMEOUT) as r:
+            r.read(1024)
+        return True, time.perf_counter() - start, ""
+    except urllib.error.HTTPError as e:
+        return e.code in UP_STATUSES, time.perf_counter() - start, f"HTTP {e.code}"
+    except Exception as e:
+        return False, None, str(e)
+
+
+def sweep():
+    """Probe every registered target once (in parallel) and publish a new snapshot."""
+    global _snapshot
+    targets = dict(_targets)
+    if not targets:
+        return _snapshot
+    futures = {name: executor.submit('probe', _probe, url) for name, url in targets.items()}
+    results = {name: fut.result() for name, fut in futures.items()}
+    _snapshot = {
+        'at': time.time(),
+        'targets': {
+            name: {'ok': ok, 'latency': latency, 'error': error}
+            for name, (ok, latency, error) in results.items()
+        },
+    }
+    up = [n for n, r in _snapshot['targets'].items() if r['ok']]
+    log.info("[Probe] up: %s", ', '.join(up) or 'nothing')
+    return _snapshot
+
+
+def _loop():
+    while True:
+        try:
+            sweep()
+        except Exception as e:
+            log.warning("[Probe] sweep failed: %s", e)
+        time.sleep(PROBE_INTERVAL)
+
+
+def start(targets):
+    """Register targets and start the prober thread (idempotent)."""
+    global _thread
+    with _lock:
+        _targets.update(targets)
+        if _thread is None:
+            _thread = threading.Thread(target=_loop, name="netprobe", daemon=True)
+            _thread.start()
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Readers — cheap, lock-free, safe to call on every request
+# ─────────────────────────────────────────────────────────────────────
+
+def snapshot():
+    """Latest snapshot: {'at': ts, 'targets': {name: {'ok', 'latency', 'error'}}}."""
+    return _snapshot
+
+
+def is_up(name):
+    """
+    True if the target answered in the latest sweep.
+    Unknown targets (no sweep yet) count as up: the tier fallback chain
+    copes with a wrong guess, a blocked request would not.
+    """
+    result = _snapshot['targets'].get(name)
+    return result is None or result['ok']
+
+
+def ranked(names):
+    """Reachable names ordered by latency, followed by the unreachable ones."""
+    targets = _snapshot['targets']
+    up   = [n for n in names if is_up(n)]
+    down = [n for n in names if not is_up(n)]
+    up.sort(key=lambda n: (targets.get(n) or {}).get('latency') or 0)
+    return up + down
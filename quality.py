@@ -0,0 +1,97 @@
+"""
+quality.py — Pick a progressive stream for the viewer's connection.
+
+The watch page used to play the tallest progressive mp4, whatever the
+connection — long start-up and rebuffering on slow Wi-Fi. Every tier now
+keeps the whole progressive ladder with the watch page:
+
+  video['streams'] = [{'url', 'height', 'kbps', 'label'}, ...]   # low → high
+
+and each request picks one, first match wins:
+
+  ?quality=360 / low / high / auto   explicit choice (the player's menu
+                                     also stores it in the quality cookie)
+  Save-Data: on                      lowest rung
+  ECT: slow-2g / 2g / 3g             capped at 144p / 240p / 360p
+  Downlink: <Mbps>                   tallest rung within HEADROOM of it
+  (no hints)                         tallest rung, as before
+
+Browsers only send Downlink/ECT/Save-Data after a response has asked for
+them with Accept-CH (HINT_HEADERS).
+"""
+
+import re
+
+HINT_HEADERS = ('Save-Data', 'Downlink', 'ECT')
+COOKIE = 'quality'
+
+# Typical progressive mp4 bitrates when the source doesn't report one
+NOMINAL_KBPS = {144: 150, 240: 300, 360: 700, 480: 1200, 720: 2500, 1080: 5000}
+HEADROOM = 0.7       # only plan on 70% of the reported downlink
+ECT_CAP = {'slow-2g': 144, '2g': 240, '3g': 360}
+
+
+def _nominal(height):
+    fits = [kbps for h, kbps in NOMINAL_KBPS.items() if h <= height]
+    return fits[-1] if fits else NOMINAL_KBPS[144]
+
+
+def parse_height(label):
+    """'720p', '720p60', '1280x720' → 720; 0 when there is no height."""
+    m = re.search(r"\d+x(\d+)", label or '') or re.search(r"(\d{3,4})p", label or '')
+    return int(m.group(1)) if m else 0
+
+
+def stream(url, height, kbps=None):
+    height = int(height or 0)
+    return {
+        'url':    url,
+        'height': height,
+        'kbps':   int(kbps) if kbps else _nominal(height),
+        'label':  f"{height}p" if height else 'auto',
+    }
+
+
+def ladder(streams):
+    """One stream per height (the first seen), lowest first; url-less ones dropped."""
+    by_height = {}
+    for s in streams:
+        if s['url'] and s['height'] not in by_height:
+            by_height[s['height']] = s
+    return [by_height[h] for h in sorted(by_height)]
+
+
+def pick(streams, quality=None, save_data=False, downlink=None, ect=None):
+    """The rung to play (see module doc), or None for an empty ladder."""
+    if not streams:
+        return None
+    if quality == 'low':
+        return streams[0]
+    if quality == 'high':
+        return streams[-1]
+    if quality and quality.isdigit():
+        fit = [s for s in streams if s['height'] <= int(quality)]
+        return fit[-1] if fit else streams[0]
+    if save_data:
+        return streams[0]
+
+    cap    = ECT_CAP.get(ect)
+    budget = downlink * 1000 * HEADROOM if downlink else None
+    fit = [s for s in streams
+           if (cap is None or s['height'] <= cap) and (budget is None or s['kbps'] <= budget)]
+    return fit[-1] if fit else streams[0]
+
+
+def choose(streams, args, headers, cookies=None):
+    """pick() from a request's ?quality=, quality cookie and client hints."""
+    quality = (args.get('quality') or (cookies or {}).get(COOKIE) or '').lower()
+    if quality == 'auto':
+        quality = ''
+    try:
+        downlink = float(headers.get('Downlink', ''))
+    except ValueError:
+        downlink = None
+    return pick(streams or [], quality or None,
+                save_data=headers.get('Save-Data', '').lower() == 'on',
+                downlink=downlink,
+                ect=headers.get('ECT', '').lower() or None)
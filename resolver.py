@@ -0,0 +1,171 @@
+"""
+resolver.py — In-process DNS cache for outbound HTTP.
+
+Every urlopen() used to resolve its host again: each Invidious call, each
+channel feed, each suggestion and each probe. On the networks this runs
+on, DNS is often the slow or blocked hop. All outbound HTTP now goes
+through resolver.urlopen(), a drop-in for urllib.request.urlopen whose
+connections take their addresses from here:
+
+  answer cached < TTL            reused, no lookup               'hit'
+  failure cached < NEGATIVE_TTL  fails at once, no lookup         'negative'
+  otherwise                      one getaddrinfo per host, shared
+                                 by concurrent callers            'miss'
+  lookup fails or times out      last good answer (< STALE_GRACE) 'stale'
+
+Lookups run in the executor's 'dns' lane, so a resolver that hangs costs
+a caller at most LOOKUP_TIMEOUT (or its own socket timeout, if shorter)
+and never more than a few threads. Results are counted in
+viewtube_cache_requests_total{ns="dns"}, next to the other caches' hit
+rates. Nothing process-wide is changed: socket.getaddrinfo and
+socket.setdefaulttimeout are left alone, and yt-dlp resolves for itself.
+"""
+
+import http.client
+import ipaddress
+import os
+import socket
+import threading
+import time
+import urllib.request
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import executor
+import metrics
+
+TTL            = int(os.environ.get('VIEWTUBE_DNS_TTL', 300))   # getaddrinfo doesn't report one
+NEGATIVE_TTL   = 30
+STALE_GRACE    = 3600   # serve an expired answer this long while lookups keep failing
+LOOKUP_TIMEOUT = 2.0
+
+_cache     = {}   # {(host, port): (expires, addrinfo list or None, error)}
+_last_good = {}   # {(host, port): (resolved_at, addrinfo list)}
+_inflight  = {}   # {(host, port): Future}
+_lock      = threading.Lock()
+
+
+def _is_ip(host):
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def _lookup(key):
+    host, port = key
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except OSError as e:
+        with _lock:
+            _cache[key] = (time.time() + NEGATIVE_TTL, None, str(e))
+        raise
+    else:
+        with _lock:
+            _cache[key]     = (time.time() + TTL, infos, None)
+            _last_good[key] = (time.time(), infos)
+        return infos
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+
+
+def _stale(key, error, result):
+    """The last good answer if it is recent enough, else raise the lookup error."""
+    with _lock:
+        good = _last_good.get(key)
+    if good and time.time() - good[0] < STALE_GRACE:
+        metrics.cache_requests.inc('dns', 'stale')
+        return good[1]
+    metrics.cache_requests.inc('dns', result)
+    raise socket.gaierror(f"{key[0]}: {error}")
+
+
+def resolve(host, port, timeout=None):
+    """getaddrinfo(host, port) for TCP, through the cache (see module doc)."""
+    if _is_ip(host):
+        return socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    key = (host, port)
+    with _lock:
+        expires, infos, error = _cache.get(key, (0, None, None))
+        fresh = time.time() < expires
+        if not fresh:
+            fut = _inflight.get(key)
+            if fut is None:
+                fut = _inflight[key] = executor.submit('dns', _lookup, key)
+
+    if fresh:
+        if infos:
+            metrics.cache_requests.inc('dns', 'hit')
+            return infos
+        return _stale(key, error, 'negative')
+
+    try:
+        infos = fut.result(timeout=LOOKUP_TIMEOUT if timeout is None else min(timeout, LOOKUP_TIMEOUT))
+    except FutureTimeout:
+        return _stale(key, 'lookup timed out', 'miss')   # it finishes in the background
+    except OSError as e:
+        return _stale(key, e, 'miss')
+    metrics.cache_requests.inc('dns', 'miss')
+    return infos
+
+
+def create_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+    """socket.create_connection() with the address list from resolve()."""
+    host, port = address
+    explicit   = timeout is not socket._GLOBAL_DEFAULT_TIMEOUT
+    error = None
+    for family, socktype, proto, _, sockaddr in resolve(host, port, timeout if explicit else None):
+        sock = None
+        try:
+            sock = socket.socket(family, socktype, proto)
+            if explicit:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as e:
+            error = e
+            if sock is not None:
+                sock.close()
+    # Every address refused — the host may have moved, so look it up again next time
+    with _lock:
+        entry = _cache.get((host, port))
+        if entry and entry[1]:
+            del _cache[(host, port)]
+    raise error
+
+
+# ─────────────────────────────────────────────────────────────────────
+# urllib plumbing
+# ─────────────────────────────────────────────────────────────────────
+
+class _HTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = create_connection
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = create_connection
+
+
+class _HTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_HTTPConnection, req)
+
+
+class _HTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_HTTPSConnection, req, context=self._context)
+
+
+_opener = urllib.request.build_opener(_HTTPHandler, _HTTPSHandler)
+
+
+def urlopen(req, timeout):
+    """urllib.request.urlopen(req, timeout=timeout), resolving through the cache."""
+    return _opener.open(req, timeout=timeout)
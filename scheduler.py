@@ -0,0 +1,137 @@
+"""
+scheduler.py — Tiny in-process job scheduler for cache warm-up.
+
+A fresh process used to serve its first trending page, first searches
+and first avatars completely cold. Jobs registered here run once at boot
+and then periodically, so hot cache entries are rebuilt before they
+expire and users almost never pay the cold-fetch cost.
+
+  scheduler.every(540, build_trending_pool, name="trending")
+  scheduler.start()
+
+Each run is offset by random jitter, a job never overlaps itself, and at
+most MAX_CONCURRENCY jobs run at once.
+
+Only one process per host runs the jobs — with several gunicorn workers
+the rest would multiply upstream load for caches they all share. The
+first worker to take an flock on LOCK_PATH leads; the others retry every
+LEADER_RETRY seconds and take over if it exits.
+
+  VIEWTUBE_SCHEDULER=auto|on|off   (default auto — lock file decides)
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import logs
+
+try:
+    import fcntl
+except ImportError:   # no flock (Windows) — every process leads, as before
+    fcntl = None
+
+log = logs.get('scheduler')
+
+MAX_CONCURRENCY = 2     # upstream-friendly: warm-up must never look like a burst
+TICK            = 1.0   # seconds between due-checks
+STARTUP_SPREAD  = 5.0   # boot runs are spread over this many seconds
+MODE            = os.environ.get('VIEWTUBE_SCHEDULER', 'auto')
+LOCK_PATH       = os.environ.get('VIEWTUBE_SCHEDULER_LOCK',
+                                 os.path.join(tempfile.gettempdir(), 'viewtube-scheduler.lock'))
+LEADER_RETRY    = 30    # seconds between lock attempts by non-leaders
+
+_jobs    = []           # [{'name', 'fn', 'interval', 'jitter', 'next', 'running'}]
+_pool    = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="viewtube-warm")
+_thread  = None
+_lock    = threading.Lock()
+_leader_file = None     # held open (and flocked) for the life of the leading process
+
+
+def _next_run(interval, jitter):
+    return time.time() + interval * (1 + random.uniform(-jitter, jitter))
+
+
+def every(interval, fn, name=None, jitter=0.1, run_at_start=True, start_delay=0.0):
+    """
+    Run fn() every `interval` seconds (± jitter fraction).
+    run_at_start fires it shortly after start() (start_delay + up to STARTUP_SPREAD).
+    """
+    first = (time.time() + start_delay + random.uniform(0, STARTUP_SPREAD)
+             if run_at_start else _next_run(interval, jitter))
+    with _lock:
+        _jobs.append({
+            'name':     name or getattr(fn, '__name__', 'job'),
+            'fn':       fn,
+            'interval': interval,
+            'jitter':   jitter,
+            'next':     first,
+            'running':  False,
+        })
+
+
+def _run(job):
+    start = time.perf_counter()
+    try:
+        job['fn']()
+        log.info("[Warm] %s done in %.1fs", job['name'], time.perf_counter() - start)
+    except Exception as e:
+        log.warning("[Warm] %s failed: %s", job['name'], e)
+    finally:
+        job['next']    = _next_run(job['interval'], job['jitter'])
+        job['running'] = False
+
+
+def _try_lead():
+    global _leader_file
+    if MODE == 'on' or fcntl is None:
+        return True
+    try:
+        f = open(LOCK_PATH, 'a')
+    except OSError as e:
+        log.warning("[Warm] Can't open %s (%s), running jobs here", LOCK_PATH, e)
+        return True
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    _leader_file = f
+    return True
+
+
+def _loop():
+    if not _try_lead():
+        log.info("[Warm] Another process runs the warm-up jobs")
+        while not _try_lead():
+            time.sleep(LEADER_RETRY)
+        log.info("[Warm] Took over the warm-up jobs")
+    while True:
+        now = time.time()
+        with _lock:
+            due = [j for j in _jobs if not j['running'] and j['next'] <= now]
+            for job in due:
+                job['running'] = True
+        for job in due:
+            _pool.submit(_run, job)
+        time.sleep(TICK)
+
+
+def start():
+    """Start the scheduler thread (idempotent). Jobs only run in the leading process."""
+    global _thread
+    if MODE == 'off':
+        return
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_loop, name="scheduler", daemon=True)
+            _thread.start()
+
+
+def jobs():
+    """Registered jobs with their next run time — for debugging."""
+    with _lock:
+        return [{'name': j['name'], 'next': j['next'], 'running': j['running']} for j in _jobs]
@@ -0,0 +1,207 @@
+"""
+search_index.py — Local full-text index of every card any tier returned.
+
+When everything is blocked the mock tier can only substring-match a dozen
+hard-coded videos. Instead, every video / playlist card that yt-dlp or
+Invidious hands us is recorded here, and the index answers /search and
+/api/search-more offline — BM25-ranked, in milliseconds.
+
+Storage is an SQLite FTS5 table (unicode61 tokenizer, prefix indexes),
+so it is persistent, shared by all workers, and stays fast at hundreds of
+thousands of cards:
+
+  cards      (rowid, key 'video:<id>', data JSON, seen_at)
+  cards_fts  (title, channel)   rowid = cards.rowid
+
+Writes are queued and applied in batches by one background thread, so
+recording never adds latency to the request that produced the cards.
+"""
+
+import json
+import os
+import queue
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+
+import logs
+
+log = logs.get('search_index')
+
+INDEX_PATH     = os.environ.get("VIEWTUBE_INDEX",
+                                os.path.join(tempfile.gettempdir(), "viewtube-index.sqlite3"))
+TITLE_WEIGHT   = 10.0     # bm25 column weights — a title hit beats a channel hit
+CHANNEL_WEIGHT = 3.0
+BATCH_MAX      = 500      # cards per write transaction
+QUEUE_MAX      = 10_000   # drop (not block) when the writer falls this far behind
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_queue  = queue.Queue(maxsize=QUEUE_MAX)
+_local  = threading.local()     # one read connection per thread
+_writer = None
+_lock   = threading.Lock()
+
+
+def _connect():
+    conn = sqlite3.connect(INDEX_PATH, timeout=5, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _init_schema(conn):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS cards ("
+        "  rowid   INTEGER PRIMARY KEY,"
+        "  key     TEXT UNIQUE NOT NULL,"
+        "  data    TEXT NOT NULL,"
+        "  seen_at REAL NOT NULL)"
+    )
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5("
+        "  title, channel,"
+        "  tokenize='unicode61 remove_diacritics 2',"
+        "  prefix='2 3')"
+    )
+
+
+def _reader():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _connect()
+        _init_schema(conn)
+        _local.conn = conn
+    return conn
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Writing — record() enqueues, the writer thread applies in batches
+# ─────────────────────────────────────────────────────────────────────
+
+def _card_key(card):
+    return f"{card.get('type') or 'video'}:{card.get('id')}"
+
+
+def _write_batch(conn, cards):
+    now = time.time()
+    conn.execute("BEGIN")
+    try:
+        for card in cards:
+            key  = _card_key(card)
+            data = json.dumps(card)
+            row  = conn.execute("SELECT rowid FROM cards WHERE key = ?", (key,)).fetchone()
+            if row:
+                rowid = row[0]
+                conn.execute("UPDATE cards SET data = ?, seen_at = ? WHERE rowid = ?",
+                             (data, now, rowid))
+                conn.execute("DELETE FROM cards_fts WHERE rowid = ?", (rowid,))
+            else:
+                rowid = conn.execute("INSERT INTO cards (key, data, seen_at) VALUES (?, ?, ?)",
+                                     (key, data, now)).lastrowid
+            conn.execute("INSERT INTO cards_fts (rowid, title, channel) VALUES (?, ?, ?)",
+                         (rowid, card.get("title") or "", card.get("channel") or ""))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _writer_loop():
+    conn = _connect()
+    _init_schema(conn)
+    while True:
+        batch = {}
+        card = _queue.get()
+        batch[_card_key(card)] = card
+        # Drain whatever else is waiting, up to one batch
+        while len(batch) < BATCH_MAX:
+            try:
+                card = _queue.get_nowait()
+            except queue.Empty:
+                break
+            batch[_card_key(card)] = card
+        try:
+            _write_batch(conn, list(batch.values()))
+        except Exception as e:
+            log.warning("[Index] write failed (%s cards): %s", len(batch), e)
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is None:
+        with _lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_writer_loop, name="search-index", daemon=True)
+                _writer.start()
+
+
+def record(cards):
+    """Queue video/playlist cards for indexing. Never blocks the caller."""
+    if not cards:
+        return
+    _ensure_writer()
+    for card in cards:
+        if not card or not card.get("id") or not card.get("title"):
+            continue
+        try:
+            _queue.put_nowait(card)
+        except queue.Full:
+            return   # writer is behind — losing a few cards is fine
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Reading
+# ─────────────────────────────────────────────────────────────────────
+
+def _fts_query(query):
+    """
+    Free text → FTS5 MATCH expression. Tokens are quoted (no FTS syntax
+    injection) and OR-ed so partial matches still rank; the last token is
+    a prefix so results appear while a word is still being typed.
+    """
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return None
+    terms = [f'"{t}"' for t in tokens[:-1]] + [f'"{tokens[-1]}"*']
+    return " OR ".join(terms)
+
+
+def search(query, limit=10, offset=0):
+    """BM25-ranked cards matching query. Returns [] on an empty index or any error."""
+    match = _fts_query(query)
+    if not match:
+        return []
+    try:
+        rows = _reader().execute(
+            "SELECT cards.data FROM cards_fts JOIN cards ON cards.rowid = cards_fts.rowid "
+            "WHERE cards_fts MATCH ? "
+            "ORDER BY bm25(cards_fts, ?, ?) LIMIT ? OFFSET ?",
+            (match, TITLE_WEIGHT, CHANNEL_WEIGHT, limit, offset),
+        ).fetchall()
+    except sqlite3.Error as e:
+        log.warning("[Index] search failed: %s", e)
+        return []
+    return [json.loads(r[0]) for r in rows]
+
+
+def titles(limit=None):
+    """Indexed titles, most recently seen first (seeds autocomplete)."""
+    try:
+        rows = _reader().execute(
+            "SELECT json_extract(data, '$.title') FROM cards ORDER BY seen_at DESC LIMIT ?",
+            (limit if limit is not None else -1,),
+        ).fetchall()
+    except sqlite3.Error as e:
+        log.warning("[Index] titles failed: %s", e)
+        return []
+    return [r[0] for r in rows if r[0]]
+
+
+def size():
+    try:
+        return _reader().execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+    except sqlite3.Error:
+        return 0
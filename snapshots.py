@@ -0,0 +1,209 @@
+"""
+snapshots.py — Record-and-replay archive of real pages for offline mode.
+
+The mock tier shows the same demo data whatever was asked. Instead, every
+page a live tier produces (search results, watch pages, channels,
+playlists, the trending pool) is recorded here, and when every tier is
+down the route replays the exact page it served last time.
+
+Storage is one SQLite file (shared by workers, safe to copy around):
+
+  snapshots (kind, key, recorded_at, data)   PRIMARY KEY (kind, key)
+
+data is zlib-compressed JSON — a 10-result search page is ~1.5 KB — and
+the primary key is the index. Only the latest snapshot per page is kept.
+Writes are queued and applied by one background thread.
+
+An archive can be pre-baked for topics before going offline:
+
+  python snapshots.py bake "rust async" "python flask tutorial" --videos 3
+  python snapshots.py bake                  # invidious.NICHE_TOPICS
+  python snapshots.py stats
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+import logs
+
+log = logs.get('snapshots')
+
+ARCHIVE_PATH = os.environ.get("VIEWTUBE_SNAPSHOTS",
+                              os.path.join(tempfile.gettempdir(), "viewtube-snapshots.sqlite3"))
+QUEUE_MAX    = 2_000    # drop (not block) when the writer falls this far behind
+
+_queue  = queue.Queue(maxsize=QUEUE_MAX)
+_local  = threading.local()     # one read connection per thread
+_writer = None
+_lock   = threading.Lock()
+
+
+def _connect():
+    conn = sqlite3.connect(ARCHIVE_PATH, timeout=5, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS snapshots ("
+        "  kind        TEXT NOT NULL,"
+        "  key         TEXT NOT NULL,"
+        "  recorded_at REAL NOT NULL,"
+        "  data        BLOB NOT NULL,"
+        "  PRIMARY KEY (kind, key)) WITHOUT ROWID"
+    )
+    return conn
+
+
+def _reader():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _connect()
+    return conn
+
+
+def search_key(query, offset=0):
+    """'Rust  Async' and 'rust async' are the same page."""
+    key = " ".join(query.lower().split())
+    return f"{key}|{offset}" if offset else key
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Recording
+# ─────────────────────────────────────────────────────────────────────
+
+def _writer_loop():
+    conn = _connect()
+    while True:
+        kind, key, value, at = _queue.get()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (kind, key, recorded_at, data) VALUES (?, ?, ?, ?)",
+                (kind, key, at, zlib.compress(json.dumps(value, separators=(',', ':')).encode(), 6)),
+            )
+        except Exception as e:
+            log.warning("[Snapshot] write %s:%s failed: %s", kind, key, e)
+        finally:
+            _queue.task_done()
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is None:
+        with _lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_writer_loop, name="snapshots", daemon=True)
+                _writer.start()
+
+
+def record(kind, key, value):
+    """Queue the latest live page for (kind, key). Never blocks the caller."""
+    if not value or not key:
+        return
+    _ensure_writer()
+    try:
+        _queue.put_nowait((kind, key, value, time.time()))
+    except queue.Full:
+        pass   # writer is behind — the next live hit records it again
+
+
+def flush():
+    """Wait until every queued snapshot is on disk (CLI / shutdown)."""
+    if _writer is not None:
+        _queue.join()
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Replay
+# ─────────────────────────────────────────────────────────────────────
+
+def get(kind, key):
+    """The recorded page, or None."""
+    try:
+        row = _reader().execute(
+            "SELECT data FROM snapshots WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+    except sqlite3.Error as e:
+        log.warning("[Snapshot] read %s:%s failed: %s", kind, key, e)
+        return None
+    return json.loads(zlib.decompress(row[0])) if row else None
+
+
+def stats():
+    """{kind: (count, bytes)} — for the CLI."""
+    try:
+        rows = _reader().execute(
+            "SELECT kind, COUNT(*), SUM(LENGTH(data)) FROM snapshots GROUP BY kind").fetchall()
+    except sqlite3.Error:
+        return {}
+    return {kind: (count, size) for kind, count, size in rows}
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Pre-baking
+# ─────────────────────────────────────────────────────────────────────
+
+def bake(topics, videos_per_topic=0):
+    """
+    Record search pages (and optionally the top watch pages) for topics
+    through the normal live tiers, so they replay offline later.
+    Returns the number of pages recorded.
+    """
+    os.environ.setdefault('VIEWTUBE_WARMUP', '0')
+    import index   # lazy: index imports this module
+
+    pages = 0
+    for topic in topics:
+        videos = None
+        if index.get_data_source() == 'ytdlp':
+            try:
+                videos = index.search_youtube(topic, max_results=10)
+            except Exception as e:
+                log.warning("[Snapshot] yt-dlp bake of '%s' failed: %s", topic, e)
+        videos = videos or index.invidious.search(topic, max_results=10)
+        if not videos:
+            log.warning("[Snapshot] nothing live for '%s', skipped", topic)
+            continue
+        record('search', search_key(topic), videos)
+        pages += 1
+
+        for v in [v for v in videos if v.get('type', 'video') == 'video'][:videos_per_topic]:
+            # Stream URLs expire long before an offline replay — metadata is enough
+            info = index.get_video_info(v['id'], 'minimal') or index.invidious.get_video_info(v['id'])
+            if info:
+                record('video', v['id'], info)
+                pages += 1
+    flush()
+    return pages
+
+
+def main(argv):
+    if argv[:1] == ['stats'] or not argv:
+        for kind, (count, size) in sorted(stats().items()):
+            print(f"{kind:<10}{count:>8} pages {size / 1024:>10.0f} KB")
+        print(f"archive: {ARCHIVE_PATH}")
+        return 0
+    if argv[0] == 'bake':
+        args = argv[1:]
+        per_topic = 0
+        if '--videos' in args:
+            i = args.index('--videos')
+            per_topic = int(args[i + 1])
+            del args[i:i + 2]
+        if not args:
+            import invidious
+            args = invidious.NICHE_TOPICS
+        print(f"recorded {bake(args, per_topic)} pages into {ARCHIVE_PATH}")
+        return 0
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    # Run through the importable module so index.py and the CLI share one writer
+    import snapshots
+    sys.exit(snapshots.main(sys.argv[1:]))
@@ -15,6 +15,21 @@ class InfiniteScroll {
     init() {
         window.addEventListener('scroll', () => this.handleScroll());
         this.createLoadingIndicator();
+        // Server answered from its local index — swap in live results when they land
+        if (this.container.dataset.provisional) this.loadLive();
+    }
+
+    async loadLive() {
+        try {
+            const response = await fetch(`/api/search-more?q=${encodeURIComponent(this.query)}&offset=0`);
+            const data = await response.json();
+            if (data.videos && data.videos.length > 0) {
+                this.container.innerHTML = '';
+                this.appendVideos(data.videos);
+            }
+        } catch (error) {
+            console.error('Error loading live results:', error);
+        }
     }
 
     getQueryFromURL() {
@@ -69,8 +84,9 @@ class InfiniteScroll {
         videos.forEach(video => {
             const card = document.createElement('article');
             card.className = 'yt-result-card';
+            const href = video.type === 'playlist' ? `/playlist/${video.id}` : `/watch?v=${video.id}`;
             card.innerHTML = `
-                <a href="/watch?v=${video.id}" class="yt-result-card-link" aria-label="${video.title}">
+                <a href="${href}" class="yt-result-card-link" aria-label="${video.title}">
                     <div class="yt-result-thumbnail-wrapper">
                         <img src="${video.thumbnail}" alt="${video.title}" class="yt-result-thumbnail" loading="lazy">
                         ${video.duration ? `<span class="yt-duration">${video.duration}</span>` : ''}
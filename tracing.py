@@ -0,0 +1,118 @@
+"""
+tracing.py — Per-request spans, emitted as a Server-Timing header.
+
+A slow /watch could be tier detection, yt-dlp extraction, the avatar
+lookup or template rendering, and nothing told them apart. Code wraps
+those steps in spans:
+
+    with tracing.span('ytdlp', 'video'):
+        info = ydl.extract_info(url, download=False)
+
+and after_request turns the collected spans into
+
+    Server-Timing: source;dur=0.1, ytdlp;desc="video";dur=2140.3, render;dur=11.8, total;dur=2160.4
+
+which browser devtools show under Network → Timing. With
+VIEWTUBE_TRACE=1 every request is also logged as one JSON line;
+VIEWTUBE_TRACE=<seconds> logs only requests slower than that.
+
+The span list lives in a ContextVar, so work handed to deadline.run /
+deadline.submit (which copy the context) records into the same request.
+Outside a request span() is a no-op.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import time
+
+import logs
+
+_log = logs.get('tracing')
+
+MAX_HEADER_SPANS = 24   # keep the header well under proxy limits
+
+
+def _trace_threshold(value):
+    """VIEWTUBE_TRACE → None (off), 0.0 (log all) or a slow-request threshold in seconds."""
+    value = (value or '').strip()
+    if value in ('', '0'):
+        return None
+    if value == '1':
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+TRACE_LOG = _trace_threshold(os.environ.get('VIEWTUBE_TRACE'))
+
+_spans = contextvars.ContextVar('viewtube_spans', default=None)
+
+
+def start():
+    """Begin collecting spans for the current request."""
+    spans = []
+    _spans.set(spans)
+    return spans
+
+
+@contextlib.contextmanager
+def span(name, desc=None):
+    """Time the enclosed block as one span (name must be a token: no spaces)."""
+    spans = _spans.get()
+    if spans is None:
+        yield
+        return
+    begin = time.perf_counter()
+    try:
+        yield
+    finally:
+        # list.append is atomic — safe from stage / background threads
+        spans.append((name, desc, (time.perf_counter() - begin) * 1000))
+
+
+def add(name, duration_ms, desc=None):
+    """Record a span whose duration was measured elsewhere."""
+    spans = _spans.get()
+    if spans is not None:
+        spans.append((name, desc, duration_ms))
+
+
+def traced(name, desc=None):
+    """Decorator form of span() for whole functions."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(name, desc):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def server_timing(total_ms=None):
+    """Server-Timing header value for the current request's spans."""
+    spans = list(_spans.get() or [])[:MAX_HEADER_SPANS]
+    if total_ms is not None:
+        spans.append(('total', None, total_ms))
+    parts = []
+    for name, desc, dur in spans:
+        desc = f';desc="{str(desc).replace(chr(34), "")}"' if desc else ''
+        parts.append(f"{name}{desc};dur={dur:.1f}")
+    return ", ".join(parts)
+
+
+def log(method, path, status, total_ms):
+    """Log the request as a JSON trace line when VIEWTUBE_TRACE asks for it."""
+    if TRACE_LOG is None or total_ms < TRACE_LOG * 1000:
+        return
+    _log.info("[Trace] %s", json.dumps({
+        'method': method,
+        'path':   path,
+        'status': status,
+        'ms':     round(total_ms, 1),
+        'spans':  [{'name': n, 'desc': d, 'ms': round(ms, 1)} for n, d, ms in _spans.get() or []],
+    }))
+
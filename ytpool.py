@@ -0,0 +1,253 @@
+"""
+ytpool.py — Where yt-dlp extractions run: in-thread or in worker processes.
+
+yt-dlp spends real CPU on each extraction (building YoutubeDL, parsing
+the page JSON and player JS, sorting formats), and under a threaded
+server concurrent extract_info() calls take turns on the GIL. With
+
+  VIEWTUBE_YTDLP_MODE=process
+
+extractions run in a pool of warm worker processes instead — yt_dlp is
+imported and its extractors loaded once per worker, and each worker
+keeps its YoutubeDL objects between calls — so extraction scales across
+cores. The default ('thread') runs them in the calling thread as before;
+serverless deploys should keep it.
+
+index.py swaps yt_dlp.YoutubeDL for the drop-in here and keeps its code:
+
+  with ytpool.YoutubeDL(ydl_opts) as ydl:                   # search, channel, playlist
+      result = ydl.extract_info(url, download=False)
+  with ytpool.YoutubeDL(ydl_opts, shape='video') as ydl:    # watch page
+      info = ydl.extract_info(url, download=False)
+
+Watch-page extractions pick a PROFILE — the cheapest one that still has
+what the caller needs (see PROFILES below).
+
+Slimming keeps only the fields the card builders in index.py read, so a
+watch extraction crosses the process boundary as a few KB instead of the
+~1 MB info dict. Both modes slim, so they return the same shape.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import admission
+import deadline
+import logs
+
+log = logs.get('ytpool')
+
+MODE      = os.environ.get('VIEWTUBE_YTDLP_MODE', 'thread')
+# One worker per admission slot — an admitted extraction never queues again
+PROCESSES = int(os.environ.get('VIEWTUBE_YTDLP_PROCESSES', admission.MAX_EXTRACTIONS))
+# forkserver, not fork: forking a threaded server can copy locks held by other threads
+START_METHOD = os.environ.get('VIEWTUBE_YTDLP_START', 'forkserver')
+WORKER_YDL_MAX = 8    # distinct option sets kept per worker (playlist windows differ)
+# The request deadline doesn't cross into the worker, so the caller enforces
+# it — capped at this for callers without one (background jobs)
+WORKER_TIMEOUT = 60
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class ExtractionError(RuntimeError):
+    """An extraction failed inside a worker process (message keeps the original type)."""
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Extraction profiles — yt-dlp options layered over a caller's base opts
+#
+#  minimal : title, channel, counts, thumbnail — no stream URLs. Skips the
+#            player JS download and signature deciphering (the CPU-heavy
+#            part) and the DASH/HLS manifest requests. Cards, indexing,
+#            snapshot baking.
+#  stream  : metadata + the progressive (video+audio) mp4 formats the
+#            <video> tag plays. Skips the manifest requests and selects
+#            progressive only instead of building a merge.
+#  full    : everything, with the bestvideo+bestaudio merge selector.
+# ─────────────────────────────────────────────────────────────────────
+
+PROFILES = {
+    'minimal': {
+        'ignore_no_formats_error': True,
+        'check_formats': False,
+        'extractor_args': {'youtube': {'player_skip': ['js'], 'skip': ['dash', 'hls', 'translated_subs']}},
+    },
+    'stream': {
+        'format': 'best[ext=mp4][vcodec!=none][acodec!=none]/best[ext=mp4]/best',
+        'check_formats': False,
+        'extractor_args': {'youtube': {'skip': ['dash', 'hls', 'translated_subs']}},
+    },
+    'full': {
+        'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+    },
+}
+
+
+def profile_opts(base, profile):
+    """base ydl_opts with a PROFILES entry layered on top."""
+    return {**base, **PROFILES[profile]}
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Slimming — only what index.py's card builders read
+# ─────────────────────────────────────────────────────────────────────
+
+_CARD_KEYS = ('_type', 'id', 'url', 'title', 'description', 'thumbnail', 'uploader', 'channel',
+              'channel_id', 'uploader_id', 'uploader_url', 'duration', 'view_count',
+              'upload_date', 'playlist_count', 'video_count')
+_VIDEO_KEYS = _CARD_KEYS + ('like_count', 'channel_thumbnail', 'uploader_avatar', 'avatar',
+                            'comments')
+_FORMAT_KEYS = ('format_id', 'format_note', 'ext', 'vcodec', 'acodec', 'width', 'height',
+                'fps', 'tbr', 'filesize', 'filesize_approx', 'url')
+
+
+def _thumbnails(thumbs):
+    # Cards read thumbnails[0], channel headers thumbnails[-1]
+    thumbs = [{'url': t.get('url')} for t in thumbs or [] if t]
+    return thumbs[:1] + thumbs[-1:] if len(thumbs) > 1 else thumbs
+
+
+def _slim_flat(info):
+    out = {k: info[k] for k in _CARD_KEYS if k in info}
+    if info.get('thumbnails'):
+        out['thumbnails'] = _thumbnails(info['thumbnails'])
+    if info.get('entries') is not None:
+        # Channel pages nest tabs as playlists of entries
+        out['entries'] = [_slim_flat(e) if e else None for e in info['entries']]
+    return out
+
+
+def _slim_video(info):
+    out = {k: info[k] for k in _VIDEO_KEYS if k in info}
+    out['formats'] = [{k: f[k] for k in _FORMAT_KEYS if k in f} for f in info.get('formats') or []]
+    return out
+
+
+SHAPES = {'flat': _slim_flat, 'video': _slim_video}
+
+
+def _shape(info, shape):
+    return SHAPES[shape](info) if info else info
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Worker side
+# ─────────────────────────────────────────────────────────────────────
+
+_worker_ydls = {}   # per worker process: options key → YoutubeDL
+
+
+def _init_worker():
+    """Import yt_dlp and load its extractor classes before the first request."""
+    import yt_dlp
+    yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True, 'logger': logs.YTDLP_LOGGER})
+    log.debug("[YtPool] worker %s ready", os.getpid())
+
+
+def _worker_extract(url, opts, shape):
+    import yt_dlp
+    key = repr(sorted(opts.items()))
+    ydl = _worker_ydls.get(key)
+    if ydl is None:
+        if len(_worker_ydls) >= WORKER_YDL_MAX:
+            _worker_ydls.clear()
+        ydl = _worker_ydls[key] = yt_dlp.YoutubeDL({**opts, 'logger': logs.YTDLP_LOGGER})
+    try:
+        return _shape(ydl.extract_info(url, download=False), shape)
+    except Exception as e:
+        # yt-dlp errors don't always survive pickling — send a plain one back
+        raise ExtractionError(f"{type(e).__name__}: {e}") from None
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Caller side
+# ─────────────────────────────────────────────────────────────────────
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                ctx = multiprocessing.get_context(START_METHOD)
+                if START_METHOD == 'forkserver':
+                    # The fork server loads this module (and yt-dlp) instead of the default
+                    # ['__main__'], so it never runs the app's import-time start-up
+                    ctx.set_forkserver_preload(['ytpool'])
+                _pool = ProcessPoolExecutor(
+                    max_workers=PROCESSES,
+                    mp_context=ctx,
+                    initializer=_init_worker,
+                )
+                log.info("[YtPool] %s yt-dlp worker processes (%s)", PROCESSES, START_METHOD)
+    return _pool
+
+
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def extract(url, opts, shape='flat'):
+    """
+    extract_info(url, download=False) with opts, slimmed to shape
+    ('flat' or 'video'). Returns None when yt-dlp found nothing.
+    """
+    if MODE != 'process':
+        import yt_dlp
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            return _shape(ydl.extract_info(url, download=False), shape)
+
+    pool = _get_pool()
+    worker_opts = {k: v for k, v in opts.items() if k != 'logger'}   # workers log on their own
+    fut = pool.submit(_worker_extract, url, worker_opts, shape)
+    try:
+        return fut.result(timeout=deadline.current().clamp(WORKER_TIMEOUT))
+    except FutureTimeout:
+        # Frees the caller's admission slot and lane thread; the worker finishes
+        # (or hits yt-dlp's socket timeout) on its own
+        fut.cancel()
+        raise ExtractionError("yt-dlp worker timed out") from None
+    except BrokenProcessPool:
+        # A worker died (OOM, segfault) — start a fresh pool for the next call
+        log.warning("[YtPool] worker pool broke, restarting")
+        _reset_pool(pool)
+        raise ExtractionError("yt-dlp worker process died") from None
+
+
+class YoutubeDL:
+    """Stand-in for yt_dlp.YoutubeDL whose extract_info() goes through extract()."""
+
+    def __init__(self, opts, shape='flat'):
+        self.params, self.shape = opts, shape
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=False):
+        return extract(url, self.params, self.shape)
+
+
+def prestart():
+    """Spin the workers up now instead of on the first extraction."""
+    if MODE == 'process' and multiprocessing.current_process().name == 'MainProcess':   # never from a worker
+        pool = _get_pool()
+        for f in [pool.submit(os.getpid) for _ in range(PROCESSES)]:
+            f.result()
+
+
+@atexit.register
+def _shutdown():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)